@@ -0,0 +1,172 @@
+import heapq
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from resume_analysis import BUNDLE_MODE, MAX_CONCURRENCY, analyze_resumes, set_thread_error_handler
+from results_store import results_store
+from tracing import Tracer
+
+
+# Analysis jobs run at most this many at a time; each one has its own LLM call pool
+JOB_WORKERS = int(os.getenv("HIRELY_JOB_WORKERS", "2"))
+
+# Finished jobs stay around this long so a refreshed page can still reattach
+JOB_TTL = float(os.getenv("HIRELY_JOB_TTL", "3600"))
+MAX_JOBS = int(os.getenv("HIRELY_MAX_JOBS", "100"))
+
+# Best candidates tracked while results stream in; everything else is read from the results store
+TOP_K = int(os.getenv("HIRELY_RESULTS_TOP_K", "10"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class AnalysisJob:
+    def __init__(self, resumes, jd_text, bundle, store, meta, tracer=None, results=results_store):
+        self.id = uuid.uuid4().hex[:12]
+        self.resumes = resumes
+        self.jd_text = jd_text
+        self.bundle = bundle
+        self.store = store
+        # Whatever the UI needs to restore itself after a refresh (hashes, documents, pre-rank scores)
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.progress = {name: QUEUED for name, _ in resumes}
+        # Finished entries go straight to the results store; only the top-k stay in memory
+        self.results = results
+        self.done = 0
+        self._leaders = []
+        self._positions = {name: position for position, (name, _) in enumerate(resumes)}
+        self._texts = dict(resumes)
+        self.errors = []
+        self.error = None
+        self.reused = 0
+        self.tracer = tracer or Tracer(run_id=self.id)
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def leaders(self, k=TOP_K):
+        # Best average first; ties keep upload order
+        with self._lock:
+            ranked = sorted(self._leaders, reverse=True)
+        return [(name, avg) for avg, _, name in ranked[:k]]
+
+    def counts(self):
+        with self._lock:
+            return self.done, len(self.resumes)
+
+    def _on_start(self, name):
+        # A resume only shows as running once one of its calls is actually in flight
+        with self._lock:
+            if self.progress[name] == QUEUED:
+                self.progress[name] = RUNNING
+
+    def _on_result(self, name, entry):
+        position = self._positions[name]
+        self.results.put(self.id, position, name, entry, self._texts[name], self.meta.get("prerank", {}).get(name))
+        with self._lock:
+            self.done += 1
+            self.progress[name] = DONE
+            # Min-heap of the k best averages: O(log k) per result instead of re-sorting the pool
+            if entry["Avg"] is not None:
+                item = (entry["Avg"], -position, name)
+                if len(self._leaders) < TOP_K:
+                    heapq.heappush(self._leaders, item)
+                elif item > self._leaders[0]:
+                    heapq.heapreplace(self._leaders, item)
+
+    def _add_error(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self._finish(CANCELLED)
+            return
+        self.status = RUNNING
+        set_thread_error_handler(self._add_error)
+        hits_before = self.store.stats["hits"] if self.store is not None else 0
+        try:
+            with self.tracer.activate():
+                analyze_resumes(
+                    self.resumes,
+                    self.jd_text,
+                    max_workers=MAX_CONCURRENCY,
+                    bundle=self.bundle,
+                    initializer=set_thread_error_handler,
+                    initargs=(self._add_error,),
+                    store=self.store,
+                    on_result=self._on_result,
+                    cancel=self.cancel_event,
+                    on_start=self._on_start,
+                )
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._finish(FAILED)
+            return
+        finally:
+            if self.store is not None:
+                self.reused = self.store.stats["hits"] - hits_before
+        self._finish(CANCELLED if self.cancel_event.is_set() else DONE)
+
+    def _finish(self, status):
+        with self._lock:
+            for name, state in self.progress.items():
+                if state != DONE:
+                    self.progress[name] = CANCELLED if status == CANCELLED else FAILED
+        self.finished = time.time()
+        self.status = status
+
+
+class JobManager:
+    # Process-wide, so jobs outlive Streamlit reruns and page refreshes
+    def __init__(self, workers=JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hirely-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, resumes, jd_text, bundle=BUNDLE_MODE, store=None, meta=None, tracer=None):
+        job = AnalysisJob(list(resumes), jd_text, bundle, store, meta, tracer)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._pool.submit(job.run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+        return job
+
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and now - job.finished > JOB_TTL:
+                self._drop(job)
+        finished = sorted((job for job in self._jobs.values() if not job.active), key=lambda job: job.finished)
+        for job in finished[:max(0, len(self._jobs) - MAX_JOBS)]:
+            self._drop(job)
+
+    def _drop(self, job):
+        del self._jobs[job.id]
+        job.results.delete_job(job.id)
+
+
+job_manager = JobManager()
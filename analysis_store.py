@@ -0,0 +1,66 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+# Field results kept per store before the least recently used are dropped
+STORE_ENTRIES = int(os.getenv("HIRELY_ANALYSIS_STORE_ENTRIES", "2000"))
+
+# The inputs each analysis field depends on; name and summary don't change with the JD.
+# "Scores" holds every scoring model's score for the pair.
+FIELD_INPUTS = {
+    "Candidate": ("resume",),
+    "Summary": ("resume",),
+    "MissingSkills": ("resume", "jd"),
+    "Suggestions": ("resume", "jd"),
+    "Scores": ("resume", "jd"),
+}
+
+ANALYSIS_FIELDS = tuple(FIELD_INPUTS)
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def field_key(field, resume_hash, jd_hash):
+    hashes = {"resume": resume_hash, "jd": jd_hash}
+    return (field,) + tuple(hashes[name] for name in FIELD_INPUTS[field])
+
+
+class AnalysisStore:
+    # Per-field analysis results keyed by the hashes of the inputs they depend on
+    def __init__(self, max_entries=STORE_ENTRIES):
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_fields(self, resume_text, jd_text):
+        resume_hash, jd_hash = text_hash(resume_text), text_hash(jd_text)
+        found = {}
+        with self._lock:
+            for field in ANALYSIS_FIELDS:
+                key = field_key(field, resume_hash, jd_hash)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[field] = self._entries[key]
+                    self.stats["hits"] += 1
+                else:
+                    self.stats["misses"] += 1
+        return found
+
+    def put_fields(self, resume_text, jd_text, values):
+        resume_hash, jd_hash = text_hash(resume_text), text_hash(jd_text)
+        with self._lock:
+            for field, value in values.items():
+                key = field_key(field, resume_hash, jd_hash)
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
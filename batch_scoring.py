@@ -0,0 +1,233 @@
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from multi_file_ingestion import content_hash, load_and_split_resume
+from llm_scheduler import BATCH, set_lane, share_limits
+from prerank import shortlist
+from resume_analysis import MAX_CONCURRENCY, analyze_resume, extract_candidate_name, score_resume, skill_gap
+from scoring import SCORING_MODELS
+
+
+RESUME_EXTENSIONS = (".pdf", ".txt", ".docx", ".doc")
+
+# Share of each provider's RPM/TPM this process may use; the app's lanes and buckets don't reach it
+BATCH_LIMIT_SHARE = float(os.getenv("HIRELY_BATCH_LIMIT_SHARE", "0.5"))
+
+
+def score_column(model_name):
+    return re.sub(r"\W+", "_", model_name.lower()).strip("_")
+
+
+# One score column per configured scoring model ("Google Gemini" -> google_gemini)
+SCORE_COLUMNS = {model.name: score_column(model.name) for model in SCORING_MODELS}
+
+CSV_FIELDS = [
+    "resume", "jd", "resume_sha", "jd_sha", "prerank", "candidate", "avg",
+    *SCORE_COLUMNS.values(), "failed", "missing_skills", "summary", "skills", "suggestions",
+]
+
+
+def list_resumes(resume_dir):
+    return sorted(
+        os.path.join(resume_dir, name)
+        for name in os.listdir(resume_dir)
+        if name.lower().endswith(RESUME_EXTENSIONS)
+    )
+
+
+def load_text(file_path):
+    return "\n".join(doc.page_content for doc in load_and_split_resume(file_path))
+
+
+def completed_pairs(output_path, fmt):
+    # Pairs already written by an earlier (possibly crashed) run
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            content = f.read()
+            rows = list(csv.DictReader(io.StringIO(content, newline="")))
+            # A row cut short by a crash is missing columns (None), or its last column if no newline followed
+            if content and not content.endswith("\n"):
+                rows = rows[:-1]
+            rows = [row for row in rows if all(row.get(field) is not None for field in CSV_FIELDS)]
+        else:
+            rows = []
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn last line from a crash; that pair is scored again
+                    continue
+        for row in rows:
+            # Pairs with a failed model are scored again on the next run
+            if row.get("resume_sha") and row.get("jd_sha") and not row.get("failed"):
+                done.add((row["resume_sha"], row["jd_sha"]))
+    return done
+
+
+def score_pair(resume_path, resume_sha, jd_path, jd_sha, jd_text, full=False, prerank_score=None):
+    resume_text = load_text(resume_path)
+    row = {
+        "resume": os.path.basename(resume_path),
+        "jd": os.path.basename(jd_path),
+        "resume_sha": resume_sha,
+        "jd_sha": jd_sha,
+        "prerank": prerank_score,
+    }
+
+    if full:
+        result = analyze_resume(resume_text, jd_text)
+        row.update({
+            "candidate": result["Candidate"],
+            "avg": result["Avg"],
+            "scores": result["Scores"],
+            "failed": result["Failed"],
+            "missing_skills": result["MissingSkills"],
+            "summary": result["Summary"],
+            "skills": result["Skills"],
+            "suggestions": result["Suggestions"],
+        })
+    else:
+        scores, avg_score = score_resume(resume_text, jd_text)
+        row.update({
+            "candidate": extract_candidate_name(resume_text),
+            "avg": avg_score,
+            "scores": scores,
+            "failed": [model for model, score in scores.items() if score is None],
+            "missing_skills": skill_gap(resume_text, jd_text),
+        })
+    return row
+
+
+class ResultWriter:
+    # Appends one record per finished pair and flushes so a crash loses nothing written
+    def __init__(self, output_path, fmt):
+        self.fmt = fmt
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._file = open(output_path, "a", encoding="utf-8", newline="")
+        self._lock = threading.Lock()
+        if not new_file:
+            with open(output_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    # Terminate a torn record so the next one starts on its own line
+                    self._file.write("\n")
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, row):
+        with self._lock:
+            if self.fmt == "csv":
+                flat = dict(row)
+                for model_name, column in SCORE_COLUMNS.items():
+                    flat[column] = row["scores"].get(model_name)
+                flat["failed"] = "; ".join(row["failed"])
+                flat["missing_skills"] = "; ".join(row["missing_skills"])
+                self._csv.writerow(flat)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def run_batch(resume_dir, jd_paths, output_path, fmt="jsonl", max_workers=MAX_CONCURRENCY, full=False,
+              progress=None, top_k=0, min_prerank=0.0):
+    resumes = [(path, content_hash(path)) for path in list_resumes(resume_dir)]
+    jds = [(path, content_hash(path), load_text(path)) for path in jd_paths]
+
+    # Pre-rank locally so only the shortlist per JD reaches the LLMs
+    prerank_scores = {}
+    filtered = bool(top_k or min_prerank)
+    if filtered:
+        resume_texts = [load_text(path) for path, _ in resumes]
+        for jd_path, jd_sha, jd_text in jds:
+            kept, ranked = shortlist(list(range(len(resumes))), resume_texts, jd_text, top_k, min_prerank)
+            for i in kept:
+                prerank_scores[(resumes[i][1], jd_sha)] = ranked[i]
+
+    done = completed_pairs(output_path, fmt)
+    pairs = [
+        (resume_path, resume_sha, jd_path, jd_sha, jd_text)
+        for jd_path, jd_sha, jd_text in jds
+        for resume_path, resume_sha in resumes
+        if (resume_sha, jd_sha) not in done
+        # A filter that keeps nothing sends nothing to the LLMs
+        and (not filtered or (resume_sha, jd_sha) in prerank_scores)
+    ]
+
+    writer = ResultWriter(output_path, fmt)
+    scored = 0
+    try:
+        # Batch calls queue behind interactive and analysis calls made in this process
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=set_lane, initargs=(BATCH,)) as pool:
+            futures = {
+                pool.submit(score_pair, *pair, full=full, prerank_score=prerank_scores.get((pair[1], pair[3]))): pair
+                for pair in pairs
+            }
+            for future in as_completed(futures):
+                resume_path, _, jd_path, _, _ = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"⚠️ Failed to score {resume_path} against {jd_path}: {e}", file=sys.stderr)
+                    continue
+                writer.write(row)
+                scored += 1
+                if progress:
+                    progress(scored, len(pairs), row)
+    finally:
+        writer.close()
+
+    return {"scored": scored, "skipped": len(resumes) * len(jds) - len(pairs), "pending": len(pairs)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every resume in a directory against one or more job descriptions.")
+    parser.add_argument("resume_dir", help="Directory of resumes (.pdf, .txt, .docx, .doc)")
+    parser.add_argument("jd", nargs="+", help="Job description file(s)")
+    parser.add_argument("-o", "--output", default="scores.jsonl", help="Output file; existing results are skipped on rerun")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], help="Output format (default: from the output extension)")
+    parser.add_argument("-j", "--workers", type=int, default=MAX_CONCURRENCY, help="Pairs scored concurrently")
+    parser.add_argument("--full", action="store_true", help="Also generate summary, missing skills and suggestions")
+    parser.add_argument("--top-k", type=int, default=0, help="Only LLM-score the top K resumes per JD by local pre-rank")
+    parser.add_argument("--min-prerank", type=float, default=0.0, help="Only LLM-score resumes at or above this pre-rank (0-100)")
+    parser.add_argument("--limit-share", type=float, default=BATCH_LIMIT_SHARE,
+                        help="Share of each provider's rate limits to use, leaving the rest to the app (0-1)")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.limit_share <= 1:
+        parser.error("--limit-share must be in (0, 1]")
+    share_limits(args.limit_share)
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    def progress(scored, total, row):
+        status = f"{row['avg']}%" if row["avg"] is not None else "failed"
+        if row["failed"]:
+            status += f" (failed: {', '.join(row['failed'])})"
+        print(f"[{scored}/{total}] {row['resume']} × {row['jd']}: {status}", flush=True)
+
+    summary = run_batch(
+        args.resume_dir, args.jd, args.output, fmt, args.workers, args.full, progress,
+        top_k=args.top_k, min_prerank=args.min_prerank,
+    )
+    print(f"✅ Scored {summary['scored']} pairs ({summary['skipped']} done or filtered out) → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from stub_llm_server import DEFAULT_CONFIG, start_stub_server
+
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+# Allowed slowdown over the baseline before a stage counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Stages whose latencies are too small to compare reliably are skipped
+MIN_COMPARABLE_MS = 5.0
+
+FIRST_NAMES = ["Jane", "John", "Priya", "Carlos", "Mei", "Amara", "Lukas", "Sofia", "Omar", "Hana"]
+LAST_NAMES = ["Doe", "Smith", "Raman", "Mendes", "Chen", "Okafor", "Weber", "Rossi", "Haddad", "Sato"]
+ROLES = ["Software Engineer", "Data Scientist", "ML Engineer", "Backend Developer", "DevOps Engineer"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Optimized", "Shipped", "Automated", "Scaled"]
+
+# Modules main.py pulls in at start-up
+APP_MODULES = [
+    "multi_file_ingestion", "llm_cache", "resume_analysis", "prerank",
+    "chat_store", "pdf_extract", "reports", "tracing", "skill_extractor", "llm_client",
+]
+
+# Run in a fresh interpreter so every measurement is a cold start
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(time.perf_counter() - started)
+"""
+
+RERUN_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("main.py", default_timeout=120)
+started = time.perf_counter()
+app.run()
+first_run = time.perf_counter() - started
+reruns = []
+for _ in range(int(sys.argv[1])):
+    started = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - started)
+print(json.dumps({"first_run": first_run, "reruns": reruns, "exceptions": len(app.exception)}))
+"""
+
+CHAT_QUESTIONS = [
+    "Is this candidate a good fit for the role?",
+    "What are the biggest gaps against the job description?",
+    "How many years of relevant experience does the candidate have?",
+    "Which projects are most relevant to this job?",
+]
+
+
+def configure_environment(base_url, cache_dir, keep_limits=False):
+    # Must run before the app modules are imported: they read their settings at import time
+    os.environ["HIRELY_GROQ_BASE_URL"] = base_url
+    os.environ["HIRELY_GEMINI_BASE_URL"] = base_url
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ["HIRELY_LLM_CACHE_PATH"] = os.path.join(cache_dir, "llm_cache.sqlite")
+    os.environ["HIRELY_LLM_BACKOFF_BASE"] = os.getenv("HIRELY_LLM_BACKOFF_BASE", "0.05")
+    if not keep_limits:
+        for provider in ("GROQ", "GEMINI"):
+            os.environ[f"HIRELY_{provider}_RPM"] = "0"
+            os.environ[f"HIRELY_{provider}_TPM"] = "0"
+
+
+def synthetic_resume(rng, skills, index):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    known = rng.sample(skills, k=min(len(skills), rng.randint(6, 18)))
+    lines = [name, rng.choice(ROLES), "", "Skills: " + ", ".join(known), "", "Experience"]
+    for _ in range(rng.randint(3, 12)):
+        lines.append(f"- {rng.choice(VERBS)} a {rng.choice(known)} service used by {rng.randint(2, 900)}k users")
+    lines += ["", "Education", f"B.Sc. Computer Science, class of {2000 + index % 24}"]
+    return "\n".join(lines)
+
+
+def synthetic_jd(rng, skills):
+    must = rng.sample(skills, k=min(len(skills), 8))
+    nice = rng.sample(skills, k=min(len(skills), 4))
+    return "\n".join([
+        f"Senior {rng.choice(ROLES)}",
+        "Requirements: " + ", ".join(must),
+        "Nice to have: " + ", ".join(nice),
+        f"We expect {rng.randint(3, 10)}+ years of experience shipping production systems.",
+    ])
+
+
+def write_pdf(path, text):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=11)
+    pdf.multi_cell(0, 6, text.encode("latin-1", "replace").decode("latin-1"))
+    pdf.output(path)
+
+
+def build_corpus(directory, size, fmt, seed):
+    # size resumes plus one JD, written to disk so ingestion runs the real loaders
+    from skill_extractor import load_taxonomy
+
+    rng = random.Random(seed + size)
+    skills = sorted(load_taxonomy())
+    os.makedirs(directory, exist_ok=True)
+    resume_paths = []
+    for index in range(size):
+        path = os.path.join(directory, f"resume_{index:04d}.{fmt}")
+        text = synthetic_resume(rng, skills, index)
+        if fmt == "pdf":
+            write_pdf(path, text)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        resume_paths.append(path)
+
+    jd_path = os.path.join(directory, "jd.txt")
+    with open(jd_path, "w", encoding="utf-8") as f:
+        f.write(synthetic_jd(rng, skills))
+    return resume_paths, jd_path
+
+
+class Stage:
+    # Collects per-call latencies plus the traced peak memory of one stage
+    def __init__(self, name, trace_memory=True):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.latencies = []
+        self.items = 0
+        self.extra = {}
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.started
+        self.peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+        if self.trace_memory:
+            tracemalloc.stop()
+        return False
+
+    def timed(self, fn, *args, items=1, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+        self.items += items
+        return result
+
+    def summary(self):
+        latencies = np.array(self.latencies) * 1000
+        result = {
+            "calls": len(self.latencies),
+            "items": self.items,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+            "throughput_per_s": round(self.items / self.wall, 3) if self.wall else None,
+            "peak_mb": round(self.peak / (1024 * 1024), 3) if self.peak is not None else None,
+        }
+        result.update(self.extra)
+        return result
+
+
+def run_size(size, args, workdir):
+    import llm_client
+    import reports
+    import resume_analysis
+    from llm_cache import response_cache
+    from multi_file_ingestion import load_and_split_resume
+    from pdf_extract import get_backend
+    from prerank import shortlist
+    from tracing import Tracer
+
+    trace = not args.no_memory
+    resume_paths, jd_path = build_corpus(os.path.join(workdir, f"corpus_{size}"), size, args.format, args.seed)
+    stages = {}
+
+    # One-off imports and connection setup stay out of the timings
+    get_backend()
+    for provider in llm_client.PROVIDERS:
+        llm_client.get_client(provider)
+    import fpdf  # noqa: F401
+    jd_text = "\n".join(doc.page_content for doc in load_and_split_resume(jd_path, use_cache=False))
+
+    with Stage("ingest", trace) as stage:
+        texts = []
+        for path in resume_paths:
+            documents = stage.timed(load_and_split_resume, path, use_cache=False)
+            texts.append("\n".join(doc.page_content for doc in documents))
+    stages["ingest"] = stage.summary()
+
+    names = [os.path.basename(path) for path in resume_paths]
+    resumes = list(zip(names, texts))
+
+    with Stage("prerank", trace) as stage:
+        for _ in range(args.repeat):
+            stage.timed(shortlist, names, texts, jd_text, items=len(texts))
+    stages["prerank"] = stage.summary()
+
+    modes = [("analyze_bundle", True), ("analyze_per_field", False)]
+    all_scores = {}
+    for stage_name, bundle in modes:
+        with Stage(stage_name, trace) as stage:
+            for _ in range(args.repeat):
+                # Cold cache every run so each repeat reaches the stub
+                response_cache.clear()
+                all_scores = stage.timed(
+                    resume_analysis.analyze_resumes, resumes, jd_text,
+                    max_workers=args.workers, bundle=bundle, items=len(resumes),
+                )
+            stage.extra["failed_entries"] = sum(1 for entry in all_scores.values() if entry["Failed"])
+        stages[stage_name] = stage.summary()
+
+    with Stage("chat", trace) as stage:
+        response_cache.clear()
+        first_token = []
+        # Streamed turns report their token usage in a final chunk; the tracer checks it arrives
+        chat_tracer = Tracer(run_id=f"bench-chat-{size}")
+        for index in range(min(len(resumes), args.chat_turns)):
+            question = CHAT_QUESTIONS[index % len(CHAT_QUESTIONS)]
+            started = time.perf_counter()
+            chunks = 0
+            with chat_tracer.span("chat"):
+                for _ in resume_analysis.stream_resume_query(resumes[index][1], jd_text, question):
+                    if not chunks:
+                        first_token.append(time.perf_counter() - started)
+                    chunks += 1
+            stage.latencies.append(time.perf_counter() - started)
+            stage.items += 1
+        stage.extra["prompt_tokens"] = sum(record["prompt_tokens"] for record in chat_tracer.records)
+        stage.extra["completion_tokens"] = sum(record["completion_tokens"] for record in chat_tracer.records)
+        if first_token:
+            stage.extra["ttft_p50_ms"] = round(float(np.percentile(first_token, 50)) * 1000, 3)
+            stage.extra["ttft_p95_ms"] = round(float(np.percentile(first_token, 95)) * 1000, 3)
+    stages["chat"] = stage.summary()
+
+    with Stage("report", trace) as stage:
+        for _ in range(args.repeat):
+            reports.clear_report_cache()
+            for res in all_scores.values():
+                stage.timed(
+                    reports.generate_pdf,
+                    res["Candidate"], res["Avg"], res["Scores"], res["Summary"], res["Skills"], res["Suggestions"],
+                )
+    stages["report"] = stage.summary()
+
+    with Stage("report_zip", trace) as stage:
+        reports.clear_report_cache()
+        stage.timed(reports.generate_reports_zip, all_scores, items=len(all_scores))
+    stages["report_zip"] = stage.summary()
+
+    llm_client.close_clients()
+    return stages
+
+
+def _probe(code, *args, env=None):
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def _latency_row(seconds):
+    latencies = np.array(seconds) * 1000
+    return {
+        "calls": len(seconds),
+        "items": len(seconds),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "throughput_per_s": None,
+        "peak_mb": None,
+    }
+
+
+def run_startup(args, workdir):
+    # Cold import time, first script run (time to first paint) and warm rerun time of main.py
+    env = dict(os.environ, HIRELY_CHAT_DB=os.path.join(workdir, "startup_chat.sqlite"))
+    imports, first_runs, reruns = [], [], []
+    for _ in range(args.repeat):
+        imports.append(float(_probe(IMPORT_PROBE, *APP_MODULES, env=env)))
+        run = json.loads(_probe(RERUN_PROBE, args.reruns, env=env))
+        if run["exceptions"]:
+            raise RuntimeError("main.py raised during the startup benchmark")
+        first_runs.append(run["first_run"])
+        reruns.extend(run["reruns"])
+
+    return {
+        "app_import": _latency_row(imports),
+        "first_run": _latency_row(first_runs),
+        "rerun": _latency_row(reruns),
+    }
+
+
+def compare(results, baseline, tolerance):
+    # A stage regresses when its p95 latency or peak memory grows past the tolerance
+    regressions = []
+    for size, stages in results["sizes"].items():
+        for stage, current in stages.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(stage)
+            if not previous:
+                continue
+            for metric in ("p95_ms", "peak_mb"):
+                old, new = previous.get(metric), current.get(metric)
+                if old is None or new is None:
+                    continue
+                if metric == "p95_ms" and old < MIN_COMPARABLE_MS:
+                    continue
+                if new > old * (1 + tolerance):
+                    regressions.append(f"{stage}@{size} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results):
+    header = f"{'size':>6} {'stage':<18} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>10} {'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for size, stages in results["sizes"].items():
+        for stage, row in stages.items():
+            def fmt(value):
+                return "-" if value is None else f"{value:.2f}"
+            print(
+                f"{size:>6} {stage:<18} {row['calls']:>6} {fmt(row['p50_ms']):>10} {fmt(row['p95_ms']):>10} "
+                f"{fmt(row['throughput_per_s']):>10} {fmt(row['peak_mb']):>9}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Hirely's pipelines offline against a local LLM stub.")
+    parser.add_argument("--sizes", default="5,20,50", help="Comma-separated resume corpus sizes")
+    parser.add_argument("--format", choices=["pdf", "txt"], default="pdf", help="Synthetic resume file format")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage for the percentile figures")
+    parser.add_argument("--chat-turns", type=int, default=8, help="Chat questions streamed per corpus")
+    parser.add_argument("-j", "--workers", type=int, default=8, help="Analysis thread pool size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--token-rate", type=float, default=2000.0, help="Stub completion tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail")
+    parser.add_argument("--error-status", type=int, default=DEFAULT_CONFIG["error_status"])
+    parser.add_argument("--base-url", help="Use an already running stub (e.g. python stub_llm_server.py) instead")
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns of main.py per startup measurement")
+    parser.add_argument("--skip-startup", action="store_true", help="Skip the cold start / rerun benchmark")
+    parser.add_argument("--keep-limits", action="store_true", help="Keep the per-provider rate limits")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows every stage)")
+    parser.add_argument("-o", "--output", help="Write the results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, help="Store the results as the baseline")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH, help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    server = None
+    if not args.base_url:
+        server = start_stub_server(
+            latency=args.latency, jitter=args.jitter, token_rate=args.token_rate,
+            error_rate=args.error_rate, error_status=args.error_status, retry_after=0.05,
+        )
+
+    with tempfile.TemporaryDirectory(prefix="hirely_bench_") as workdir:
+        configure_environment(args.base_url or server.url, workdir, args.keep_limits)
+
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+        results = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "cpus": os.cpu_count(),
+                "format": args.format,
+                "repeat": args.repeat,
+                "workers": args.workers,
+                "stub": {
+                    "latency": args.latency, "token_rate": args.token_rate, "error_rate": args.error_rate,
+                } if server else {"base_url": args.base_url},
+            },
+            "sizes": {},
+        }
+        try:
+            if not args.skip_startup:
+                print("⏱️ Start-up and reruns...", flush=True)
+                results["sizes"]["startup"] = run_startup(args, workdir)
+            for size in sizes:
+                print(f"⏱️ Corpus of {size} resumes...", flush=True)
+                results["sizes"][str(size)] = run_size(size, args, workdir)
+        finally:
+            if server:
+                results["meta"]["stub_requests"] = server.requests
+                server.shutdown()
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline first.", file=sys.stderr)
+            status = 2
+        else:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                regressions = compare(results, json.load(f), args.tolerance)
+            if regressions:
+                print(f"❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+                for line in regressions:
+                    print(f"  {line}")
+                status = 1
+            else:
+                print(f"✅ No regressions against {args.baseline}")
+
+    if args.save_baseline:
+        if os.path.dirname(args.save_baseline):
+            os.makedirs(os.path.dirname(args.save_baseline), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlite_db import connect
+
+
+CHAT_DIR = "chat_history"
+CHAT_DB_PATH = os.getenv("HIRELY_CHAT_DB", os.path.join(CHAT_DIR, "chat.sqlite"))
+
+# Loaded message pages kept in memory, so reruns and session switches don't query SQLite again
+PAGE_CACHE_ENTRIES = int(os.getenv("HIRELY_CHAT_PAGE_CACHE_ENTRIES", "64"))
+
+
+class ChatStore:
+    # Sessions and messages in one SQLite file (WAL), indexed for listing and paging
+    def __init__(self, path=CHAT_DB_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+
+    def _conn(self):
+        if self._db is None:
+            db = connect(self.path, """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    message_count INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+                    user TEXT NOT NULL,
+                    assistant TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+                CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT);
+            """, pragmas=("synchronous=NORMAL", "foreign_keys=ON"))
+            self._db = db
+            self._import_legacy_json()
+        return self._db
+
+    def _import_legacy_json(self):
+        # One-time move of the old chat_history/chat_*.json + *_meta.json files into the store
+        db = self._db
+        if db.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_imported'").fetchone():
+            return
+
+        legacy_dir = os.path.dirname(self.path) or "."
+        for path in sorted(glob.glob(os.path.join(legacy_dir, "*.json"))):
+            if path.endswith("_meta.json"):
+                continue
+            name = os.path.basename(path)
+            title = name.replace(".json", "").replace("chat_", "").replace("_", " ").capitalize()
+            try:
+                with open(path.replace(".json", "_meta.json"), "r") as meta_file:
+                    title = json.load(meta_file).get("title", title)
+            except Exception:
+                pass
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            except Exception:
+                continue
+            # Anything else that happens to be JSON in the directory isn't a chat log
+            if not isinstance(history, list) or not all(
+                isinstance(chat, dict) and "user" in chat and "assistant" in chat for chat in history
+            ):
+                continue
+
+            created_at = os.path.getmtime(path)
+            cursor = db.execute(
+                "INSERT INTO sessions (title, created_at, updated_at, message_count) VALUES (?, ?, ?, ?)",
+                (title, created_at, created_at, len(history)),
+            )
+            db.executemany(
+                "INSERT INTO messages (session_id, user, assistant, created_at) VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, chat["user"], chat["assistant"], created_at) for chat in history],
+            )
+        db.execute("INSERT INTO store_meta (key, value) VALUES ('legacy_imported', '1')")
+        db.commit()
+
+    def create_session(self, title):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            cursor = db.execute(
+                "INSERT INTO sessions (title, created_at, updated_at) VALUES (?, ?, ?)",
+                (title, now, now),
+            )
+            db.commit()
+            return cursor.lastrowid
+
+    def list_sessions(self, limit=200):
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT id, title, message_count FROM sessions ORDER BY updated_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [{"id": row[0], "title": row[1], "message_count": row[2]} for row in rows]
+
+    def append_message(self, session_id, user, assistant):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            cursor = db.execute(
+                "INSERT INTO messages (session_id, user, assistant, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, user, assistant, now),
+            )
+            db.execute(
+                "UPDATE sessions SET updated_at = ?, message_count = message_count + 1 WHERE id = ?",
+                (now, session_id),
+            )
+            db.commit()
+            self._drop_pages(session_id)
+            return cursor.lastrowid
+
+    def _drop_pages(self, session_id):
+        for key in [key for key in self._pages if key[0] == session_id]:
+            del self._pages[key]
+
+    def load_messages(self, session_id, limit=50, before_id=None):
+        # Newest page first from the index, returned in chronological order
+        key = (session_id, limit, before_id)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return list(page)
+
+        query = "SELECT id, user, assistant FROM messages WHERE session_id = ?"
+        params = [session_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn().execute(query, params).fetchall()
+            page = [{"id": row[0], "user": row[1], "assistant": row[2]} for row in reversed(rows)]
+            self._pages[key] = page
+            while len(self._pages) > PAGE_CACHE_ENTRIES:
+                self._pages.popitem(last=False)
+        return list(page)
+
+    def delete_all(self):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM messages")
+            db.execute("DELETE FROM sessions")
+            db.commit()
+            self._pages.clear()
+
+
+chat_store = ChatStore()
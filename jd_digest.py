@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from llm_client import complete, parse_json_reply
+from skill_extractor import find_skills
+from tracing import span
+
+
+# Parsed digests kept in memory; the raw completion is also in the LLM response cache
+DIGEST_CACHE_ENTRIES = int(os.getenv("HIRELY_JD_DIGEST_ENTRIES", "128"))
+
+# After a failed digest call the local digest stands in for this long, so one run's prompts share a
+# prefix without retrying the LLM per prompt; it is never kept with the real digests
+DIGEST_RETRY_SECONDS = float(os.getenv("HIRELY_JD_DIGEST_RETRY", "30"))
+
+JD_DIGEST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "must_haves": {"type": "array", "items": {"type": "string"}},
+        "nice_to_haves": {"type": "array", "items": {"type": "string"}},
+        "seniority": {"type": "string"},
+    },
+    "required": ["must_haves", "nice_to_haves", "seniority"],
+}
+
+SENIORITY_PATTERN = re.compile(
+    r"\b(intern|junior|entry[- ]level|mid[- ]level|senior|staff|principal|lead|head of|director)\b", re.IGNORECASE
+)
+
+_digests = OrderedDict()
+_fallbacks = {}
+_digests_lock = threading.Lock()
+
+
+def build_digest_prompt(jd_text):
+    return f"""
+You are an expert technical recruiter. Condense the job description into a requirements digest.
+Respond with a JSON object containing:
+- "must_haves": skills and qualifications the job description requires, as short phrases
+- "nice_to_haves": skills and qualifications listed as preferred, a plus or optional
+- "seniority": the seniority level of the role (e.g. Junior, Mid-level, Senior, Lead)
+Job Description:
+{jd_text}
+""".strip()
+
+
+def parse_digest(content):
+    data = parse_json_reply(content)
+    for field in ("must_haves", "nice_to_haves"):
+        if not isinstance(data.get(field), list) or not all(isinstance(item, str) for item in data[field]):
+            raise ValueError(f"{field} must be a list of strings")
+    if not isinstance(data.get("seniority"), str):
+        raise ValueError("seniority must be a string")
+    return {
+        "must_haves": [item.strip() for item in data["must_haves"] if item.strip()],
+        "nice_to_haves": [item.strip() for item in data["nice_to_haves"] if item.strip()],
+        "seniority": data["seniority"].strip() or "Not specified",
+    }
+
+
+def local_digest(jd_text):
+    # Taxonomy skills and a seniority keyword, when the LLM call fails
+    match = SENIORITY_PATTERN.search(jd_text)
+    return {
+        "must_haves": sorted(find_skills(jd_text)),
+        "nice_to_haves": [],
+        "seniority": match.group(1).title() if match else "Not specified",
+    }
+
+
+def digest_jd(jd_text):
+    # None when the call fails or its reply doesn't parse; an unparseable reply is never cached
+    try:
+        content = complete(
+            "gemini",
+            "gemini-2.0-flash",
+            [{"role": "user", "content": build_digest_prompt(jd_text)}],
+            validate=parse_digest,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "jd_digest", "schema": JD_DIGEST_SCHEMA},
+            },
+        )
+        return parse_digest(content)
+    except Exception:
+        return None
+
+
+def _digest_key(jd_text):
+    return hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+
+def cached_jd_digest(jd_text):
+    # Never calls the LLM; None until the digest has been built
+    with _digests_lock:
+        return _digests.get(_digest_key(jd_text))
+
+
+def get_jd_digest(jd_text):
+    # Computed once per JD, then shared by every resume scored against it
+    key = _digest_key(jd_text)
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+        fallback = _fallbacks.get(key)
+        if fallback is not None and time.monotonic() - fallback[0] < DIGEST_RETRY_SECONDS:
+            return fallback[1]
+
+    with span("jd_digest"):
+        digest = digest_jd(jd_text)
+    if digest is None:
+        digest = local_digest(jd_text)
+        now = time.monotonic()
+        with _digests_lock:
+            for stale in [k for k, (at, _) in _fallbacks.items() if now - at >= DIGEST_RETRY_SECONDS]:
+                del _fallbacks[stale]
+            _fallbacks[key] = (now, digest)
+        return digest
+    with _digests_lock:
+        _fallbacks.pop(key, None)
+        _digests[key] = digest
+        while len(_digests) > DIGEST_CACHE_ENTRIES:
+            _digests.popitem(last=False)
+    return digest
+
+
+def format_digest(digest):
+    def bullets(items):
+        return "\n".join(f"- {item}" for item in items) if items else "- None listed"
+
+    return f"""
+Seniority: {digest["seniority"]}
+Must-haves:
+{bullets(digest["must_haves"])}
+Nice-to-haves:
+{bullets(digest["nice_to_haves"])}
+""".strip()
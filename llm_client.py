@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from llm_cache import make_key, response_cache
+from llm_replay import RECORDING, REPLAYING, wrap_transport
+from llm_scheduler import call_with_retries, estimate_tokens, schedule
+from tracing import record_llm
+
+
+load_dotenv()
+
+
+# OpenAI-compatible endpoints used by the app; base URLs can point at a local stub
+PROVIDERS = {
+    "groq": {
+        "base_url": os.getenv("HIRELY_GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
+        "api_key_env": "GROQ_API_KEY",
+    },
+    "gemini": {
+        "base_url": os.getenv(
+            "HIRELY_GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/"
+        ),
+        "api_key_env": "GOOGLE_API_KEY",
+    },
+}
+
+# Connection pool settings shared by every client
+POOL_SIZE = int(os.getenv("HIRELY_LLM_POOL_SIZE", "20"))
+KEEPALIVE_SIZE = int(os.getenv("HIRELY_LLM_KEEPALIVE", str(POOL_SIZE)))
+REQUEST_TIMEOUT = float(os.getenv("HIRELY_LLM_TIMEOUT", "60"))
+CONNECT_TIMEOUT = float(os.getenv("HIRELY_LLM_CONNECT_TIMEOUT", "10"))
+
+# Module state lives once per process, so every Streamlit session shares it
+_clients = {}
+_lock = threading.Lock()
+
+
+def _build_client(api_key, base_url):
+    # The OpenAI SDK is slow to import, so it loads with the first client rather than at app start
+    import httpx
+    from openai import OpenAI
+
+    # Record/replay (HIRELY_LLM_MODE) sits at the transport, below the SDK's request building and parsing
+    transport = wrap_transport(httpx.HTTPTransport(
+        limits=httpx.Limits(
+            max_connections=POOL_SIZE,
+            max_keepalive_connections=KEEPALIVE_SIZE,
+        ),
+    ))
+    http_client = httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+    )
+    # Retries are owned by llm_scheduler so backoff is shared across callers
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+
+def get_client(provider: str):
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    config = PROVIDERS[provider]
+    key = (provider, config["base_url"])
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                # Replay never reaches the provider, so it needs no key
+                api_key = os.getenv(config["api_key_env"]) or ("replay" if REPLAYING else None)
+                client = _build_client(api_key, config["base_url"])
+                _clients[key] = client
+    return client
+
+
+def _usage_tokens(response):
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def cached_completion(provider: str, model: str, messages: list, **params):
+    # The cached answer for this exact request, or None; never calls the provider
+    if RECORDING:
+        return None
+    cached = response_cache.get(make_key(provider, model, messages, params))
+    if cached is not None:
+        record_llm(model, cache_hit=True)
+    return cached
+
+
+def parse_json_reply(content):
+    # A JSON object reply, also when the model wraps it in a ```json code fence
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`")
+        content = content[content.find("{"):]
+    return json.loads(content)
+
+
+def _usable(key, content, validate):
+    # A cached answer the caller can't use is dropped, so the next call asks the provider again
+    if validate is None:
+        return True
+    try:
+        validate(content)
+        return True
+    except ValueError:
+        response_cache.delete(key)
+        return False
+
+
+def complete(provider: str, model: str, messages: list, use_cache: bool = True, coalesce: bool = True,
+             validate=None, **params) -> str:
+    # `validate` raises ValueError for an unusable answer (e.g. a score reply without a number);
+    # such answers are returned but never cached
+    key = make_key(provider, model, messages, params)
+    # Recording skips cache reads so every request the app makes ends up in the archive
+    if use_cache and not RECORDING:
+        cached = response_cache.get(key)
+        if cached is not None and _usable(key, cached, validate):
+            record_llm(model, cache_hit=True)
+            return cached
+
+    client = get_client(provider)
+    try:
+        response = schedule(
+            provider,
+            key,
+            lambda: client.chat.completions.create(model=model, messages=messages, **params),
+            estimate_tokens(messages, params),
+            usage_tokens=_usage_tokens,
+            coalesce=coalesce,
+        )
+    except Exception as e:
+        record_llm(model, error=e)
+        raise
+    record_llm(model, usage=getattr(response, "usage", None))
+    content = response.choices[0].message.content.strip()
+
+    if use_cache:
+        try:
+            if validate is not None:
+                validate(content)
+            response_cache.set(key, content)
+        except ValueError:
+            pass
+    return content
+
+
+def stream(provider: str, model: str, messages: list, use_cache: bool = True, **params):
+    # Yields text deltas as they arrive; a cached answer is yielded in one piece
+    key = make_key(provider, model, messages, params)
+    if use_cache and not RECORDING:
+        cached = response_cache.get(key)
+        if cached is not None:
+            record_llm(model, cache_hit=True)
+            yield cached
+            return
+
+    client = get_client(provider)
+    # Only opening the stream is retried; a stream that fails midway surfaces the error
+    try:
+        response = call_with_retries(
+            provider,
+            # include_usage adds a final chunk with token counts for the trace
+            lambda: client.chat.completions.create(
+                model=model, messages=messages, stream=True, stream_options={"include_usage": True}, **params
+            ),
+            estimate_tokens(messages, params),
+        )
+    except Exception as e:
+        record_llm(model, error=e)
+        raise
+    parts = []
+    usage = None
+    for chunk in response:
+        # Providers that honour stream_options send usage on a final, choice-less chunk
+        usage = getattr(chunk, "usage", None) or usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    record_llm(model, usage=usage)
+
+    if use_cache:
+        response_cache.set(key, "".join(parts).strip())
+
+
+def close_clients():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from sqlite_db import connect
+
+
+# "live" talks to the providers, "record" also archives every exchange, "replay" serves the archive only
+LLM_MODE = os.getenv("HIRELY_LLM_MODE", "live")
+RECORDING = LLM_MODE == "record"
+REPLAYING = LLM_MODE == "replay"
+
+ARCHIVE_PATH = os.getenv("HIRELY_LLM_ARCHIVE", os.path.join(".cache", "llm_archive.sqlite"))
+
+# "recorded" replays with the original headers/chunk timing, "instant" without any delay
+REPLAY_TIMING = os.getenv("HIRELY_REPLAY_TIMING", "recorded")
+
+# Request fields that don't change the answer and are left out of the match key
+VOLATILE_FIELDS = ("user", "stream_options")
+
+logger = logging.getLogger("hirely")
+
+
+def normalize_request(body):
+    # Key order and whitespace inside messages don't matter; the base URL isn't part of the key either
+    data = json.loads(body or b"{}")
+    for field in VOLATILE_FIELDS:
+        data.pop(field, None)
+    for message in data.get("messages", []):
+        if isinstance(message.get("content"), str):
+            message["content"] = re.sub(r"\s+", " ", message["content"]).strip()
+    return data
+
+
+def request_key(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _preview(data):
+    messages = data.get("messages") or [{}]
+    return str(messages[-1].get("content", ""))[:160]
+
+
+class Archive:
+    # Recorded exchanges in SQLite: raw response bytes plus header and chunk timing, indexed by request key
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        # Keys re-recorded in this process (older takes are replaced) and replay positions per key
+        self._recorded = set()
+        self._cursors = {}
+
+    def _conn(self):
+        if self._db is None:
+            db = connect(self.path, """
+                CREATE TABLE IF NOT EXISTS exchanges (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    model TEXT,
+                    preview TEXT,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    headers_at REAL NOT NULL,
+                    chunks TEXT NOT NULL,
+                    recorded_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_exchanges_key ON exchanges(key, seq);
+                CREATE TABLE IF NOT EXISTS unmatched (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    preview TEXT,
+                    count INTEGER NOT NULL,
+                    last_seen REAL NOT NULL
+                );
+            """)
+            self._db = db
+        return self._db
+
+    def save(self, key, data, status, headers, body, headers_at, chunks):
+        with self._lock:
+            db = self._conn()
+            if key not in self._recorded:
+                self._recorded.add(key)
+                db.execute("DELETE FROM exchanges WHERE key = ?", (key,))
+            seq = db.execute("SELECT COUNT(*) FROM exchanges WHERE key = ?", (key,)).fetchone()[0]
+            db.execute(
+                "INSERT INTO exchanges (key, seq, model, preview, status, headers, body, headers_at, chunks, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, seq, data.get("model"), _preview(data), status, json.dumps(headers), body, headers_at,
+                 json.dumps(chunks), time.time()),
+            )
+            db.commit()
+
+    def next_exchange(self, key):
+        # Takes are served in recorded order (so a 429 then its retry replay as they happened); the last one repeats
+        with self._lock:
+            db = self._conn()
+            seq = self._cursors.get(key, 0)
+            row = db.execute(
+                "SELECT status, headers, body, headers_at, chunks FROM exchanges WHERE key = ? AND seq <= ?"
+                " ORDER BY seq DESC LIMIT 1",
+                (key, seq),
+            ).fetchone()
+            if row is not None:
+                self._cursors[key] = seq + 1
+        if row is None:
+            return None
+        status, headers, body, headers_at, chunks = row
+        return status, json.loads(headers), body, headers_at, json.loads(chunks)
+
+    def add_unmatched(self, key, data):
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT INTO unmatched (key, model, preview, count, last_seen) VALUES (?, ?, ?, 1, ?)"
+                " ON CONFLICT(key) DO UPDATE SET count = count + 1, last_seen = excluded.last_seen",
+                (key, data.get("model"), _preview(data), time.time()),
+            )
+            db.commit()
+
+    def unmatched(self, limit=100):
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT key, model, preview, count FROM unmatched ORDER BY last_seen DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"key": row[0], "model": row[1], "preview": row[2], "count": row[3]} for row in rows]
+
+    def summary(self):
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT model, COUNT(*), COUNT(DISTINCT key), AVG(CAST(json_extract(chunks, '$[#-1][0]') AS REAL)),"
+                " SUM(LENGTH(body)) FROM exchanges GROUP BY model ORDER BY model"
+            ).fetchall()
+        return [
+            {"model": row[0], "exchanges": row[1], "prompts": row[2], "avg_seconds": row[3] or 0.0, "bytes": row[4]}
+            for row in rows
+        ]
+
+    def clear_unmatched(self):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM unmatched")
+            db.commit()
+
+
+def _recording_transport(inner, archive):
+    import httpx
+
+    class TeeStream(httpx.SyncByteStream):
+        # Passes chunks through as they arrive and archives the exchange once the body is consumed
+        def __init__(self, stream, on_close):
+            self._stream = stream
+            self._on_close = on_close
+            self._parts = []
+            self._chunks = []
+
+        def __iter__(self):
+            for part in self._stream:
+                self._parts.append(part)
+                self._chunks.append([time.monotonic(), len(part)])
+                yield part
+
+        def close(self):
+            self._stream.close()
+            self._on_close(b"".join(self._parts), self._chunks)
+
+    class RecordingTransport(httpx.BaseTransport):
+        def handle_request(self, request):
+            data = normalize_request(request.read())
+            key = request_key(data)
+            started = time.monotonic()
+            response = inner.handle_request(request)
+            headers_at = time.monotonic() - started
+            headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers.raw]
+
+            def on_close(body, chunks):
+                timings = [[round(at - started, 4), size] for at, size in chunks]
+                try:
+                    archive.save(key, data, response.status_code, headers, body, round(headers_at, 4), timings)
+                except Exception as e:
+                    logger.warning("LLM archive write failed: %s", e)
+
+            return httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                stream=TeeStream(response.stream, on_close),
+                extensions=response.extensions,
+            )
+
+        def close(self):
+            inner.close()
+
+    return RecordingTransport()
+
+
+def _replaying_transport(archive, timing):
+    import httpx
+
+    class ReplayStream(httpx.SyncByteStream):
+        def __init__(self, body, chunks, started):
+            self._body = body
+            self._chunks = chunks
+            self._started = started
+
+        def __iter__(self):
+            offset = 0
+            for at, size in self._chunks:
+                if timing == "recorded":
+                    time.sleep(max(0.0, self._started + at - time.monotonic()))
+                yield self._body[offset:offset + size]
+                offset += size
+            if offset < len(self._body):
+                yield self._body[offset:]
+
+    class ReplayTransport(httpx.BaseTransport):
+        def handle_request(self, request):
+            started = time.monotonic()
+            data = normalize_request(request.read())
+            key = request_key(data)
+            exchange = archive.next_exchange(key)
+            if exchange is None:
+                archive.add_unmatched(key, data)
+                logger.warning("No recorded LLM response for %s (%s): %s", key[:12], data.get("model"), _preview(data)[:80])
+                # 404 isn't retried, so the caller's usual error handling takes over at once
+                return httpx.Response(
+                    404, json={"error": {"message": f"no recorded response for request {key[:12]}", "type": "replay_miss"}}
+                )
+
+            status, headers, body, headers_at, chunks = exchange
+            if timing == "recorded":
+                time.sleep(headers_at)
+            return httpx.Response(status, headers=headers, stream=ReplayStream(body, chunks, started))
+
+    return ReplayTransport()
+
+
+archive = Archive()
+
+
+def wrap_transport(inner):
+    # Called by llm_client for every HTTP client it builds
+    if RECORDING:
+        return _recording_transport(inner, archive)
+    if REPLAYING:
+        return _replaying_transport(archive, REPLAY_TIMING)
+    return inner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a recorded LLM traffic archive.")
+    parser.add_argument("command", choices=["report", "clear-unmatched"])
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help=f"archive path (default: {ARCHIVE_PATH})")
+    args = parser.parse_args()
+
+    store = Archive(args.archive)
+    if args.command == "clear-unmatched":
+        store.clear_unmatched()
+        print("🧹 Cleared unmatched requests.")
+        return
+
+    print(f"🎞️ {args.archive}")
+    print(f"{'model':<24} {'exchanges':>10} {'prompts':>8} {'avg s':>8} {'KB':>8}")
+    for row in store.summary():
+        print(f"{str(row['model']):<24} {row['exchanges']:>10} {row['prompts']:>8} "
+              f"{row['avg_seconds']:>8.2f} {row['bytes'] / 1024:>8.1f}")
+
+    unmatched = store.unmatched()
+    print(f"\n❓ {len(unmatched)} unmatched request(s) during replay")
+    for row in unmatched:
+        print(f"  {row['key'][:12]} ×{row['count']} {row['model']}: {row['preview'][:80]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import email.utils
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from llm_replay import REPLAYING
+from tracing import record_retry
+
+
+# Priority lanes: lower runs first when a provider is saturated
+INTERACTIVE = 0
+ANALYSIS = 1
+BATCH = 2
+
+MAX_RETRIES = int(os.getenv("HIRELY_LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("HIRELY_LLM_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("HIRELY_LLM_BACKOFF_MAX", "30"))
+
+# Completion tokens assumed when a request doesn't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+
+# Requests and tokens per minute per provider; 0 disables that limit
+PROVIDER_LIMITS = {
+    "groq": {
+        "rpm": int(os.getenv("HIRELY_GROQ_RPM", "30")),
+        "tpm": int(os.getenv("HIRELY_GROQ_TPM", "30000")),
+    },
+    "gemini": {
+        "rpm": int(os.getenv("HIRELY_GEMINI_RPM", "60")),
+        "tpm": int(os.getenv("HIRELY_GEMINI_TPM", "1000000")),
+    },
+}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    # Raised once retries are exhausted or the error is not retryable
+    def __init__(self, provider, message, status=None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        # May go negative when actual usage exceeds the estimate; later callers wait it off
+        if self.capacity:
+            self.level -= min(amount, self.capacity) if amount > 0 else amount
+
+
+class ProviderLimiter:
+    # Token buckets for requests and tokens, handed out to waiters in (lane, arrival) order
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def acquire(self, tokens, lane):
+        ticket = (lane, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        now = time.monotonic()
+                        wait = max(
+                            self.paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now),
+                        )
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return
+                        self._cond.wait(timeout=wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def settle(self, estimated, actual):
+        with self._cond:
+            self.tokens.take(actual - estimated)
+
+    def saturated(self):
+        # Callers are queued or the provider told us to back off
+        with self._cond:
+            return bool(self._waiting) or self.paused_until > time.monotonic()
+
+    def pause(self, seconds):
+        # A 429 holds back every caller for this provider, not just the one that got it
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_limiter(provider):
+    with _limiters_lock:
+        if provider not in _limiters:
+            # Replayed traffic never reaches the provider, so its quotas don't apply
+            limits = {"rpm": 0, "tpm": 0} if REPLAYING else PROVIDER_LIMITS.get(provider, {"rpm": 0, "tpm": 0})
+            _limiters[provider] = ProviderLimiter(limits["rpm"], limits["tpm"])
+        return _limiters[provider]
+
+
+def share_limits(share):
+    # Buckets and lanes live in this process only: a second process (the batch CLI next to the app)
+    # takes this fraction of each quota, so the two together stay under the provider's limits
+    with _limiters_lock:
+        for limits in PROVIDER_LIMITS.values():
+            for name, value in limits.items():
+                # 0 means unlimited, so a small quota is rounded up rather than down to 0
+                limits[name] = max(1, int(value * share)) if value else 0
+        _limiters.clear()
+
+
+def current_lane():
+    return getattr(_local, "lane", ANALYSIS)
+
+
+def set_lane(lane):
+    _local.lane = lane
+
+
+def last_round_trip():
+    # Seconds the last provider call made on this thread took, without limiter waits or retry backoff;
+    # cleared once read, and never set by cache hits or calls coalesced onto another thread's request
+    round_trip = getattr(_local, "round_trip", None)
+    _local.round_trip = None
+    return round_trip
+
+
+@contextmanager
+def request_lane(lane):
+    previous = current_lane()
+    _local.lane = lane
+    try:
+        yield
+    finally:
+        _local.lane = previous
+
+
+def estimate_tokens(messages, params):
+    prompt_chars = len(json.dumps(messages, ensure_ascii=False))
+    return prompt_chars // 4 + int(params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+def _status(error):
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    # An HTTP date; anything unparseable falls back to the jittered backoff
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def _retryable(error):
+    status = _status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # Timeouts and dropped connections carry no status code
+    name = type(error).__name__
+    return name in ("APITimeoutError", "APIConnectionError", "TimeoutException", "ConnectError", "ReadTimeout")
+
+
+def backoff_delay(attempt, error=None):
+    retry_after = _retry_after(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    # Full jitter on an exponential ceiling
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def call_with_retries(provider, fn, estimated_tokens, lane=None, usage_tokens=None):
+    limiter = get_limiter(provider)
+    lane = current_lane() if lane is None else lane
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(estimated_tokens, lane)
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            status = _status(e)
+            if not _retryable(e) or attempt == MAX_RETRIES:
+                raise LLMError(provider, f"{type(e).__name__}: {e}", status) from e
+            delay = backoff_delay(attempt, e)
+            record_retry()
+            if status == 429:
+                limiter.pause(delay)
+            time.sleep(delay)
+            continue
+
+        if usage_tokens is not None:
+            actual = usage_tokens(result)
+            if actual:
+                limiter.settle(estimated_tokens, actual)
+        _local.round_trip = time.monotonic() - started
+        return result
+
+
+def schedule(provider, key, fn, estimated_tokens, usage_tokens=None, coalesce=True):
+    # Identical requests already in flight share one provider call
+    if not coalesce:
+        return call_with_retries(provider, fn, estimated_tokens, usage_tokens=usage_tokens)
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    if not owner:
+        return future.result()
+
+    try:
+        result = call_with_retries(provider, fn, estimated_tokens, usage_tokens=usage_tokens)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
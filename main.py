@@ -1,31 +1,72 @@
 import streamlit as st
 import os
-from openai import OpenAI
-import pdfplumber
-from io import StringIO
 from dotenv import load_dotenv
-import pandas as pd
-import plotly.express as px
-from multi_file_ingestion import load_and_split_resume
-from fpdf import FPDF
-import json
-from datetime import datetime
-import re
-
-
-# Ensure chat_sessions directory exists
-os.makedirs("chat_sessions", exist_ok=True)
+from multi_file_ingestion import bytes_hash, load_and_split_bytes
+from llm_cache import response_cache
+from resume_analysis import BUNDLE_MODE, select_chat_context, stream_resume_query
+from prerank import shortlist
+from chat_store import chat_store
+from pdf_extract import get_backend, warm_pool
+from reports import generate_pdf, generate_reports_zip
+from tracing import Tracer, span
+from analysis_store import AnalysisStore
+from analysis_jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, job_manager
+from results_store import SORT_COLUMNS, results_store
+from collections import Counter
+from contextlib import nullcontext
+import threading
+import llm_client
+import llm_replay
+from skill_extractor import get_matcher
+from jd_digest import cached_jd_digest
 
 
 # Load environment variables
 load_dotenv(override=True)
-google_api_key = os.getenv("GOOGLE_API_KEY")
-groq_api_key = os.getenv("GROQ_API_KEY")
+
+# Chat turns loaded per page for a saved session; only the newest CHAT_WINDOW are drawn as chat bubbles
+CHAT_PAGE_SIZE = int(os.getenv("HIRELY_CHAT_PAGE_SIZE", "50"))
+CHAT_WINDOW = max(1, int(os.getenv("HIRELY_CHAT_WINDOW", "10")))
+
+# Saved sessions listed in the sidebar per page, most recently used first
+SESSION_PAGE_SIZE = int(os.getenv("HIRELY_CHAT_SESSION_PAGE_SIZE", "200"))
+
+# Result rows per table page; up to CHART_BARS resumes get one bar each, larger pools a histogram
+RESULTS_PAGE_SIZE = int(os.getenv("HIRELY_RESULTS_PAGE_SIZE", "25"))
+CHART_BARS = int(os.getenv("HIRELY_RESULTS_CHART_BARS", "30"))
+
+# Reports in the "all resumes" ZIP; larger pools export their best-scoring resumes up to this many
+REPORTS_ZIP_LIMIT = int(os.getenv("HIRELY_REPORTS_ZIP_LIMIT", "500"))
+
+# Resumes listed by name in the progress panel (running and failed only); the rest are counted
+PROGRESS_LIST_LIMIT = int(os.getenv("HIRELY_PROGRESS_LIST_LIMIT", "50"))
 
 # Streamlit config
 st.set_page_config(page_title="🧠 Hirely AI", layout="wide",page_icon="📄")
 
 
+# LLM clients, the PDF backend and worker pool, and the skill matcher are built once per process, in the
+# background. Each lives in its own module (llm_client, pdf_extract, skill_extractor), which is where the
+# app reads it; pandas/plotly are left to load with the first results.
+def _warm_up():
+    for provider in llm_client.PROVIDERS:
+        try:
+            llm_client.get_client(provider)
+        except Exception:
+            # e.g. a missing API key; the first real call reports it
+            pass
+    get_backend()
+    warm_pool()
+    get_matcher()
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    thread = threading.Thread(target=_warm_up, daemon=True, name="hirely-warm-up")
+    thread.start()
+    return thread
+
+
 if "pdf_download_clicked" not in st.session_state:
     st.session_state.pdf_download_clicked = False
 
@@ -123,288 +164,125 @@ st.markdown("""
 
 
 
-def clean_unicode(text):
-    return (
-        text.encode("ascii", "ignore")
-            .decode("ascii")
-            .replace("•", "-")
-            .replace("–", "-")
-            .replace("—", "-")
-    )
-
-
-# Extract PDF or text
-def extract_text(file):
-    if file.name.endswith(".pdf"):
-        with pdfplumber.open(file) as pdf:
-            return "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-    else:
-        return StringIO(file.read().decode("utf-8")).read()
-
-# Candidate name extractor using Groq
-def extract_candidate_name(resume_text):
-    prompt = f"""
-You are an AI assistant specialized in resume analysis.
-Your task is to get full name of the candidate from the resume.
-Resume:
-{resume_text}
-Respond with only the candidate's full name.
-"""
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        response = groq.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[
-                {"role": "system", "content": "You are a professional resume evaluator."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
-    except Exception:
-        return "Unknown"
-
-# Prompt builder
-def build_prompt(resume_text, jd_text):
-    return f"""
-You are an AI assistant specialized in resume analysis and recruitment.
-Analyze the given resume and compare it with the job description.
-Provide a match percentage between 0 and 100.
-Resume:
-{resume_text}
-Job Description:
-{jd_text}
-Respond with only the match percentage as an integer.
-""".strip()
-
-# Skill gap analysis
-def extract_skill_gap(resume_text, jd_text):
-    prompt = f"""
-You are an expert HR AI. Find out which skills are missing in the resume based on the job description.
-
-Resume:
-{resume_text}
-
-Job Description:
-{jd_text}
-
-List the missing skills only as bullet points.
-"""
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        response = groq.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"⚠️ Error: {e}")
-        return "N/A"
-
-
-#AI Chat assistant for Resume Feedback
-
-def answer_resume_query(resume_text, jd_text, user_question, model="groq"):
-    prompt = f"""
-You are an AI career assistant. A candidate has asked a question about improving their resume based on the job description.
-
-Resume:
-{resume_text}
-
-Job Description:
-{jd_text}
-
-Question:
-{user_question}
-
-Give an answer like a friendly career coach. Include examples, avoid generic advice, and use a helpful, human tone.
-
-"""
-    try:
-        if model == "groq":
-            groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-            response = groq.chat.completions.create(
-                model="llama3-8b-8192",
-                messages=[
-                    {"role": "system", "content": "You are a professional resume coach."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-        else:
-            gemini = OpenAI(api_key=google_api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
-            response = gemini.chat.completions.create(
-                model="gemini-2.0-flash",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"⚠️ Error: {e}"
-
-
-# Resume improvement suggestions
-def suggest_improvements(resume_text, jd_text):
-    prompt = f"""
-You are a career advisor AI. Based on the following resume and job description, provide 3 personalized suggestions to improve the resume to better match the job.
-
-Resume:
-{resume_text}
-Job Description:
-{jd_text}
-
-List only 3 improvement suggestions.
-"""
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        response = groq.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"⚠️ Error: {e}")
-
-        return "N/A"
-
-
-# Resume summary
-def generate_summary(resume_text):
-    prompt = f"""
-Summarize the resume in 3 short bullet points. Highlight top achievements and strengths.
-
-Resume:
-{resume_text}
-"""
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        response = groq.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"⚠️ Error: {e}")
-
-        return "N/A"
-
-
-# Get match scores
-
-def get_google_match(prompt):
-    try:
-        gemini = OpenAI(api_key=google_api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
-        response = gemini.chat.completions.create(
-            model="gemini-2.0-flash",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        digits = ''.join(filter(str.isdigit, response.choices[0].message.content))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"⚠️ Error: {e}")
-        return 0
-
-def get_groq_match(prompt):
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        response = groq.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        digits = ''.join(filter(str.isdigit, response.choices[0].message.content))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"⚠️ Error: {e}")
-        return 0
-
-def generate_pdf(candidate_name, avg_score, scores, summary, skills, suggestions):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(200, 10, txt="Hirely Pro - Resume Match Report", ln=True, align="C")
-
-    pdf.set_font("Arial", size=12)
-    pdf.ln(10)
-    pdf.cell(200, 10, txt=f"Candidate: {clean_unicode(candidate_name)}", ln=True)
-    pdf.cell(200, 10, txt=f"Average Match Score: {avg_score}%", ln=True)
-
-    pdf.ln(5)
-    pdf.cell(200, 10, txt="Model Scores:", ln=True)
-    for model, score in scores.items():
-        pdf.cell(200, 10, txt=f"{model}: {score}%", ln=True)
-
-    pdf.ln(5)
-    pdf.multi_cell(0, 10, f"Summary:\n{clean_unicode(summary)}")
-    pdf.ln(2)
-    pdf.multi_cell(0, 10, f"Missing Skills:\n{clean_unicode(skills)}")
-    pdf.ln(2)
-    pdf.multi_cell(0, 10, f"Suggestions:\n{clean_unicode(suggestions)}")
-
-    output_path = "temp_files/report.pdf"
-    pdf.output(output_path)
-    return output_path
-
-
-def save_chat_to_file(history, filename):
-    path = os.path.join("chat_history", filename)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
-
-def load_chat_from_file(filename):
-    path = os.path.join("chat_history", filename)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-
-def list_chat_sessions():
-    return [f for f in os.listdir("chat_sessions") if f.endswith(".json")]
+# Per-session document store keyed by content hash; uploads are parsed from memory
+def ingest_upload(uploaded_file):
+    data = uploaded_file.getbuffer()
+    key = bytes_hash(data)
+    documents = st.session_state.setdefault("documents", {})
+    if key not in documents:
+        docs = load_and_split_bytes(data, uploaded_file.name, content_key=key)
+        documents[key] = {"name": uploaded_file.name, "text": "\n".join([doc.page_content for doc in docs])}
+    return key
+
+
+# Spans recorded after the analysis (reports, chat) join the same run's trace
+def trace_span(stage, resume=None):
+    tracer = st.session_state.get("tracer")
+    return tracer.span(stage, resume) if tracer else nullcontext()
+
+
+# The running analysis job; the id is also in the URL so a refreshed page reattaches to it
+def current_job():
+    job_id = st.session_state.get("job_id") or st.query_params.get("job")
+    job = job_manager.get(job_id) if job_id else None
+    if job is not None and st.session_state.get("job_id") != job.id:
+        st.session_state.job_id = job.id
+        st.session_state.documents = dict(job.meta["documents"])
+        st.session_state.jd_hash = job.meta["jd_hash"]
+    return job
+
+
+def chat_resume(job):
+    # The resume open in the details view, else the best match so far
+    name = st.session_state.get("detail_resume")
+    if name is None or results_store.resume_text(job.id, name) is None:
+        rows = results_store.page(job.id, limit=1)
+        name = rows[0]["Resume File"] if rows else None
+    return name
+
+
+JOB_STATE_ICONS = {QUEUED: "🕒", RUNNING: "⏳", DONE: "✅", CANCELLED: "⛔", FAILED: "❌"}
+
+
+def render_job_progress(job):
+    done, total = job.counts()
+    if job.active:
+        st.progress(done / total if total else 1.0, text=f"Analyzing... {done}/{total} resumes done")
+        if st.button("⛔ Cancel Analysis"):
+            job_manager.cancel(job.id)
+            st.info("Cancelling: resumes already being scored will finish, the rest are skipped.")
+    elif job.status == DONE:
+        st.success("✅ All Resumes Analyzed!")
+        if job.reused:
+            st.info(f"♻️ Reused {job.reused} unchanged result(s); only new or changed inputs were analyzed.")
+    elif job.status == CANCELLED:
+        st.warning(f"⛔ Analysis cancelled after {done}/{total} resumes.")
+    elif job.status == FAILED:
+        st.error(f"⚠️ Analysis failed: {job.error}")
+
+    # Counts per state, then only the resumes in flight or failed, so a rerun stays small for large pools
+    progress = list(job.progress.items())
+    counts = Counter(state for _, state in progress)
+    listed = [(name, state) for name, state in progress if state in (RUNNING, FAILED)]
+    with st.expander("📋 Per-resume progress", expanded=job.active):
+        st.markdown(" · ".join(f"{icon} {counts[state]} {state}" for state, icon in JOB_STATE_ICONS.items() if counts[state]))
+        if listed:
+            st.markdown("\n".join(
+                f"- {JOB_STATE_ICONS[state]} **{name}** — {state}" for name, state in listed[:PROGRESS_LIST_LIMIT]
+            ))
+        if len(listed) > PROGRESS_LIST_LIMIT:
+            st.caption(f"… and {len(listed) - PROGRESS_LIST_LIMIT} more")
+
+    # Helper failures collected by the job, most recent first
+    for message in list(dict.fromkeys(reversed(job.errors)))[:5]:
+        st.error(message)
 
 
 with st.sidebar:
     st.markdown("## 🗂️ Chat Sessions")
 
-    os.makedirs("chat_history", exist_ok=True)
-
-    # Load chat files & titles
-    chat_files = sorted([
-        f for f in os.listdir("chat_history")
-        if f.endswith(".json") and not f.endswith("_meta.json")
-    ])
+    # One indexed query instead of opening every session file; older sessions page in on request
+    session_limit = st.session_state.get("session_list_limit", SESSION_PAGE_SIZE)
+    sessions = chat_store.list_sessions(limit=session_limit + 1)
+    more_sessions = len(sessions) > session_limit
+    sessions = sessions[:session_limit]
+    session_titles = {session["id"]: session["title"] for session in sessions}
+    message_counts = {session["id"]: session["message_count"] for session in sessions}
+
+    selected_session = st.selectbox(
+        "📁 Load Chat Session",
+        [None] + list(session_titles.keys()),
+        format_func=lambda session_id: "(New Chat)" if session_id is None else session_titles[session_id],
+    )
 
-    session_map = {}
-    for f in chat_files:
-        meta_path = f.replace(".json", "_meta.json")
-        title = f.replace(".json", "").replace("chat_", "").replace("_", " ").capitalize()
-        try:
-            with open(os.path.join("chat_history", meta_path), "r") as meta_file:
-                meta = json.load(meta_file)
-                title = meta.get("title", title)
-        except:
-            pass
-        session_map[title] = f
+    if more_sessions and st.button("📂 Show older sessions"):
+        st.session_state.session_list_limit = session_limit + SESSION_PAGE_SIZE
+        st.rerun()
 
-    selected_title = st.selectbox("📁 Load Chat Session", ["(New Chat)"] + list(session_map.keys()))
+    # Only a new pick in the list switches sessions; the history itself is paged in by the chat section
+    if "selected_session" not in st.session_state or selected_session != st.session_state.selected_session:
+        st.session_state.selected_session = selected_session
+        st.session_state.current_session = selected_session
+        st.session_state.session_title = session_titles.get(selected_session)
+        st.session_state.chat_page_limit = CHAT_PAGE_SIZE
 
-    if selected_title == "(New Chat)":
-        st.session_state.chat_history = []
+    if st.button("🗑️ Delete All History"):
+        chat_store.delete_all()
         st.session_state.current_session = None
         st.session_state.session_title = None
-    else:
-        st.session_state.chat_history = load_chat_from_file(session_map[selected_title])
-        st.session_state.current_session = session_map[selected_title]
-        st.session_state.session_title = selected_title
-
-    if st.button("🗑️ Delete All History"):
-        for file in os.listdir("chat_history"):
-            os.remove(os.path.join("chat_history", file))
         st.success("✅ Deleted all chat sessions. Please refresh to update.")
 
+    st.markdown("---")
+    if llm_replay.REPLAYING:
+        st.caption(f"🎞️ Replaying recorded LLM traffic · {len(llm_replay.archive.unmatched())} unmatched request(s)")
+    elif llm_replay.RECORDING:
+        st.caption("⏺️ Recording LLM traffic")
+    stats = response_cache.stats
+    st.caption(
+        f"⚡ LLM cache: {stats['memory_hits'] + stats['disk_hits']} hits · "
+        f"{stats['misses']} misses ({response_cache.hit_rate():.0%} hit rate)"
+    )
 
-def slugify(text, max_words=6):
-    text = re.sub(r'[^\w\s-]', '', text).strip().lower()
-    words = text.split()[:max_words]
-    return "_".join(words)
 
 # ==== UI with Tabs ====
 tab1, tab2 = st.tabs(["📁 Upload Files", "📊 View Results"])
@@ -417,110 +295,251 @@ with tab1:
 
     jd_file = st.file_uploader("📝 Upload Job Description", type=None)
 
-    if st.button("🔍 Analyze Fit" , key="analyze_button_tab1") and resume_files and jd_file:
-        with st.spinner("Analyzing..."):
-            os.makedirs("temp_files", exist_ok=True)
+    bundle_mode = st.checkbox("⚡ Single-call analysis (faster, falls back to per-field prompts)", value=BUNDLE_MODE)
 
-            # Process JD
-            jd_path = os.path.join("temp_files", jd_file.name)
-            with open(jd_path, "wb") as f:
-                f.write(jd_file.getbuffer())
-            jd_docs = load_and_split_resume(jd_path)
-            jd_text = "\n".join([doc.page_content for doc in jd_docs])
+    # Local BM25 pre-ranking decides which resumes get the LLM calls
+    col_top_k, col_min_score = st.columns(2)
+    with col_top_k:
+        prerank_top_k = st.number_input("🎯 Shortlist top-K resumes for AI scoring (0 = all)", min_value=0, value=0, step=1)
+    with col_min_score:
+        prerank_min_score = st.slider("📉 Minimum pre-rank score (relative to best resume)", 0, 100, 0)
 
-            all_scores = {}
-            resume_details = []
+    if st.button("🔍 Analyze Fit" , key="analyze_button_tab1") and resume_files and jd_file:
+        tracer = Tracer()
+        with st.spinner("Reading files..."), tracer.activate():
+            # Process JD
+            jd_hash = ingest_upload(jd_file)
+            jd_text = st.session_state.documents[jd_hash]["text"]
 
+            resumes = []
             for resume_file in resume_files:
-                resume_path = os.path.join("temp_files", resume_file.name)
-                with open(resume_path, "wb") as f:
-                    f.write(resume_file.getbuffer())
-                resume_docs = load_and_split_resume(resume_path)
-                resume_text = "\n".join([doc.page_content for doc in resume_docs])
-
-                prompt = build_prompt(resume_text, jd_text)
-
-                candidate_name = extract_candidate_name(resume_text)
-                summary = generate_summary(resume_text)
-                skills_missing = extract_skill_gap(resume_text, jd_text)
-                suggestions = suggest_improvements(resume_text, jd_text)
-
-                scores = {
-                    "Google Gemini": get_google_match(prompt),
-                    "Groq LLaMA3": get_groq_match(prompt),
-                }
-
-                avg_score = round(sum(scores.values()) / len(scores), 2)
-
-                all_scores[resume_file.name] = {
-                    "Candidate": candidate_name,
-                    "Avg": avg_score,
-                    "Scores": scores,
-                    "Summary": summary,
-                    "Skills": skills_missing,
-                    "Suggestions": suggestions
-                }
+                resume_hash = ingest_upload(resume_file)
+                resumes.append((resume_file.name, st.session_state.documents[resume_hash]["text"]))
+
+            with span("prerank"):
+                kept, prerank_scores = shortlist(
+                    [name for name, _ in resumes],
+                    [text for _, text in resumes],
+                    jd_text,
+                    top_k=prerank_top_k,
+                    min_score=prerank_min_score,
+                )
+        skipped = len(resumes) - len(kept)
+        if skipped:
+            st.info(f"⏭️ Pre-ranking skipped {skipped} low-matching resume(s).")
+        kept = set(kept)
+        kept_resumes = [(name, text) for name, text in resumes if name in kept]
+
+        # Only the JD stays in the session; resume text and results live in the results store
+        st.session_state.jd_hash = jd_hash
+        st.session_state.documents = {jd_hash: st.session_state.documents[jd_hash]}
+        st.session_state.pop("detail_resume", None)
+
+        if kept_resumes:
+            previous = current_job()
+            if previous is not None and previous.active:
+                job_manager.cancel(previous.id)
+
+            # Results are reused per field while the inputs they depend on are unchanged
+            store = st.session_state.setdefault("analysis_store", AnalysisStore())
+            job = job_manager.submit(
+                kept_resumes,
+                jd_text,
+                bundle=bundle_mode,
+                store=store,
+                tracer=tracer,
+                meta={
+                    "jd_hash": jd_hash,
+                    "documents": dict(st.session_state.documents),
+                    "prerank": {name: prerank_scores[name] for name in kept},
+                },
+            )
+            st.session_state.job_id = job.id
+            st.query_params["job"] = job.id
+            st.success("🚀 Analysis started! Results appear in '📊 View Results' as each resume finishes.")
+        else:
+            st.warning("⚠️ No resume passed the pre-ranking filter. Lower the minimum score and try again.")
 
-            st.session_state.all_scores = all_scores
-            st.success("✅ All Resumes Analyzed! Go to '📊 View Results' tab.")
 
+def render_results():
+    job = current_job()
+    if job is None:
+        return
+    st.session_state.tracer = job.tracer
+    render_job_progress(job)
+    # The job just finished: one full rerun stops the polling and refreshes the chat section
+    if not job.active and st.session_state.get("job_polling"):
+        st.session_state.job_polling = False
+        st.rerun()
 
-with tab2:
-    st.header("📊 Match Result Overview")
+    # Rows are sorted, filtered and paged by the results store; only one page is ever in memory
+    total = results_store.count(job.id)
+    if total:
+        # Only needed once there are results to show
+        import pandas as pd
+        import plotly.express as px
 
-    if "all_scores" in st.session_state:
-        all_scores = st.session_state.all_scores
-        best_resume = max(all_scores.items(), key=lambda x: x[1]["Avg"])
+        leaders = job.leaders()
 
         st.subheader("📈 Best Resume Recommendation")
-        st.success(f"🏆 {best_resume[0]} is the best match with {best_resume[1]['Avg']}% score.")
-
-        resume_df = pd.DataFrame([
-            {
-                "Resume File": name,
-                "Candidate": data["Candidate"],
-                "Avg Score": data["Avg"],
-                **data["Scores"]
-            } for name, data in all_scores.items()
-        ])
-
-        st.dataframe(resume_df, use_container_width=True)
-
-        fig = px.bar(resume_df, x="Resume File", y="Avg Score", text="Avg Score", color="Resume File")
+        if leaders:
+            best_name, best_avg = leaders[0]
+            st.success(f"🏆 {best_name} is the best match with {best_avg}% score.")
+        else:
+            st.error("⚠️ Every scoring call failed. Check your API keys or rate limits and try again.")
+
+        # Built once per JD and shared by every resume's prompts
+        jd_doc = st.session_state.get("documents", {}).get(st.session_state.get("jd_hash"))
+        digest = cached_jd_digest(jd_doc["text"]) if jd_doc else None
+        if digest:
+            with st.expander(f"🎯 Requirements Digest ({digest['seniority']})"):
+                st.markdown("**Must-haves:** " + (", ".join(digest["must_haves"]) or "none listed"))
+                st.markdown("**Nice-to-haves:** " + (", ".join(digest["nice_to_haves"]) or "none listed"))
+
+        failed = results_store.count(job.id, failed_only=True)
+        if failed:
+            st.warning(f"⚠️ Scoring failed for some models on {failed} resume(s); their averages use the remaining models (see the Failed column).")
+
+        if total > CHART_BARS:
+            st.markdown(f"**🏅 Top {len(leaders)} of {total}**")
+            st.dataframe(pd.DataFrame(leaders, columns=["Resume File", "Avg Score"]), use_container_width=True)
+            fig = px.bar(pd.DataFrame(results_store.histogram(job.id)), x="Score", y="Resumes", text="Resumes",
+                         title="Average score distribution")
+        else:
+            chart_df = pd.DataFrame(results_store.page(job.id, "Upload order", descending=False, limit=CHART_BARS))
+            fig = px.bar(chart_df, x="Resume File", y="Avg Score", text="Avg Score", color="Resume File")
         st.plotly_chart(fig, use_container_width=True)
 
-        # Show individual resume details
-        selected_resume = st.selectbox("📝 Select a Resume to View Details", list(all_scores.keys()))
-        res = all_scores[selected_resume]
-
-        st.markdown(f"**👤 Candidate:** {res['Candidate']}")
-        st.markdown(f"**📈 Avg. Score:** {res['Avg']}%")
-        st.markdown("---")
-        st.markdown(f"**🧠 Summary:**\n{res['Summary']}")
-        st.markdown("---")
-        st.markdown(f"**📌 Missing Skills:**\n{res['Skills']}")
-        st.markdown("---")
-        st.markdown(f"**💡 Suggestions:**\n{res['Suggestions']}")
-
-        # PDF Download (independent)
-        st.markdown("### 📄 Download PDF")
-        if st.button("📥 Generate and Download PDF for Selected Resume"):
-            pdf_path = generate_pdf(
-                res['Candidate'],
-                res['Avg'],
-                res['Scores'],
-                res['Summary'],
-                res['Skills'],
-                res['Suggestions']
+        col_search, col_min, col_sort, col_order = st.columns([3, 2, 2, 1])
+        with col_search:
+            search = st.text_input("🔎 Filter by file or candidate", key="results_search")
+        with col_min:
+            min_score = st.number_input("Minimum avg score", min_value=0, max_value=100, value=0, key="results_min_score")
+        with col_sort:
+            sort = st.selectbox("Sort by", list(SORT_COLUMNS), key="results_sort")
+        with col_order:
+            descending = st.toggle("Desc", value=True, key="results_desc")
+
+        matching = results_store.count(job.id, search, min_score)
+        pages = max(1, -(-matching // RESULTS_PAGE_SIZE))
+        if st.session_state.get("results_page", 1) > pages:
+            st.session_state.results_page = pages
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="results_page")
+        offset = (page - 1) * RESULTS_PAGE_SIZE
+        rows = results_store.page(job.id, sort, descending, offset, RESULTS_PAGE_SIZE, search, min_score)
+        st.caption(f"Showing {offset + 1 if rows else 0}–{offset + len(rows)} of {matching} matching resume(s), {total} analyzed")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+        # Details are loaded for the one resume being viewed
+        if rows:
+            selected_resume = st.selectbox(
+                "📝 Select a Resume to View Details", [row["Resume File"] for row in rows], key="detail_resume"
             )
-            with open(pdf_path, "rb") as f:
+            res = results_store.detail(job.id, selected_resume)
+
+            st.markdown(f"**👤 Candidate:** {res['Candidate']}")
+            st.markdown(f"**📈 Avg. Score:** {res['Avg']}%" if res['Avg'] is not None else "**📈 Avg. Score:** failed")
+            st.markdown("---")
+            st.markdown(f"**🧠 Summary:**\n{res['Summary']}")
+            st.markdown("---")
+            st.markdown(f"**📌 Missing Skills:**\n{res['Skills']}")
+            st.markdown("---")
+            st.markdown(f"**💡 Suggestions:**\n{res['Suggestions']}")
+
+            # PDF Download (independent)
+            st.markdown("### 📄 Download PDF")
+            if st.button("📥 Generate and Download PDF for Selected Resume"):
+                with trace_span("generate_pdf", selected_resume):
+                    pdf_bytes = generate_pdf(
+                        res['Candidate'],
+                        res['Avg'],
+                        res['Scores'],
+                        res['Summary'],
+                        res['Skills'],
+                        res['Suggestions']
+                    )
                 st.download_button(
                     label="⬇️ Click to Download",
-                    data=f,
+                    data=pdf_bytes,
                     file_name=f"{selected_resume}_report.pdf",
                     mime="application/pdf"
+                )
+
+        # Every resume up to HIRELY_REPORTS_ZIP_LIMIT; beyond that the best-scoring ones, and the UI says so
+        if total > REPORTS_ZIP_LIMIT:
+            zip_label = f"📦 Generate Reports for the Top {REPORTS_ZIP_LIMIT} Resumes (ZIP)"
+            zip_names = [row["Resume File"] for row in results_store.page(job.id, "Avg Score", limit=REPORTS_ZIP_LIMIT)]
+            st.caption(f"ℹ️ The ZIP covers the {REPORTS_ZIP_LIMIT} best-scoring of {total} resumes "
+                       f"(raise HIRELY_REPORTS_ZIP_LIMIT to include more); single reports are available for every resume above.")
+        else:
+            zip_label = "📦 Generate Reports for All Resumes (ZIP)"
+            zip_names = [row["Resume File"] for row in results_store.page(job.id, "Upload order", descending=False, limit=total)]
+        if zip_names and st.button(zip_label):
+            with trace_span("generate_reports_zip"):
+                zip_bytes = generate_reports_zip(results_store.details(job.id, zip_names))
+            st.download_button(
+                label="⬇️ Download All Reports",
+                data=zip_bytes,
+                file_name="hirely_reports.zip",
+                mime="application/zip"
             )
 
+        # Where the time, tokens and money went for this analysis
+        tracer = st.session_state.get("tracer")
+        if tracer and tracer.records:
+            with st.expander("⏱️ Timing Breakdown"):
+                stage_df = pd.DataFrame(tracer.summarize("stage"))
+                st.markdown("**Per stage**")
+                st.dataframe(stage_df, use_container_width=True)
+
+                records_df = pd.DataFrame(tracer.snapshot())
+                per_resume = records_df[records_df["resume"].notna()]
+                if not per_resume.empty:
+                    per_resume = per_resume.groupby(["resume", "stage"], as_index=False)["seconds"].sum()
+                    # Large pools chart only the slowest resumes
+                    slowest = per_resume.groupby("resume")["seconds"].sum().nlargest(CHART_BARS).index
+                    per_resume = per_resume[per_resume["resume"].isin(slowest)]
+                    st.markdown("**Per resume**" if len(slowest) < CHART_BARS else f"**Slowest {CHART_BARS} resumes**")
+                    fig = px.bar(per_resume, x="resume", y="seconds", color="stage", title="Time spent per resume and stage")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                pdf_rows = [
+                    {"file": record["resume"], **{k: v for k, v in record["pdf"].items() if k != "per_page_seconds"}}
+                    for record in tracer.snapshot() if record["pdf"]
+                ]
+                if pdf_rows:
+                    # Per-page timings are in the JSONL export
+                    st.markdown("**PDF extraction**")
+                    st.dataframe(pd.DataFrame(pdf_rows), use_container_width=True)
+
+                col_jsonl, col_prom = st.columns(2)
+                with col_jsonl:
+                    st.download_button(
+                        label="⬇️ Export trace (JSONL)",
+                        data=tracer.to_jsonl(),
+                        file_name=f"hirely_trace_{tracer.run_id}.jsonl",
+                        mime="application/x-ndjson"
+                    )
+                with col_prom:
+                    st.download_button(
+                        label="⬇️ Export metrics (Prometheus)",
+                        data=tracer.to_prometheus(),
+                        file_name=f"hirely_metrics_{tracer.run_id}.prom",
+                        mime="text/plain"
+                    )
+
+
+with tab2:
+    st.header("📊 Match Result Overview")
+
+    # While a job runs, only this part of the page reruns, once a second
+    job = current_job()
+    if job is not None and job.active:
+        st.session_state.job_polling = True
+        st.fragment(run_every=1.0)(render_results)()
+    else:
+        render_results()
+
 
 st.markdown("---")
 st.subheader("💬 Ask AI About This Resume")
@@ -529,14 +548,26 @@ st.subheader("💬 Ask AI About This Resume")
 st.markdown("## 🤖 ResBot - Your AI Resume Assistant")
 st.caption("Chat live with your AI assistant to refine your resume.")
 
-# Initialize history
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-
-# Display past messages
-for chat in st.session_state.chat_history:
-    st.chat_message("user").markdown(chat["user"])
-    st.chat_message("assistant").markdown(chat["assistant"])
+# Past turns come from the chat store's cached pages instead of session state
+session_id = st.session_state.get("current_session")
+if session_id is not None:
+    limit = st.session_state.get("chat_page_limit", CHAT_PAGE_SIZE)
+    turns = chat_store.load_messages(session_id, limit=limit)
+    if message_counts.get(session_id, 0) > len(turns):
+        if st.button("⬆️ Load earlier messages"):
+            st.session_state.chat_page_limit = limit + CHAT_PAGE_SIZE
+            st.rerun()
+
+    # Turns older than the window go into one collapsed block rather than two chat bubbles each
+    older, recent = turns[:-CHAT_WINDOW], turns[-CHAT_WINDOW:]
+    if older:
+        with st.expander(f"🗂️ {len(older)} earlier turns"):
+            st.markdown("\n\n---\n\n".join(
+                f"**🧑 You:** {chat['user']}\n\n**🤖 ResBot:** {chat['assistant']}" for chat in older
+            ))
+    for chat in recent:
+        st.chat_message("user").markdown(chat["user"])
+        st.chat_message("assistant").markdown(chat["assistant"])
 
 col1, col2 = st.columns([5, 1])  # 5:1 ratio for input vs dropdown
 
@@ -552,46 +583,43 @@ with col2:
     )
 
 if user_prompt:
-    if "all_scores" in st.session_state and "jd_file" in locals():
-        # Use fallback resume if selected_resume is not accessible here
-        selected_resume = list(st.session_state.all_scores.keys())[0]
-
+    job = current_job()
+    selected_resume = chat_resume(job) if job is not None else None
+    if selected_resume is not None and "jd_hash" in st.session_state:
         try:
-            with st.spinner("Thinking..."):
-                resume_path = f"temp_files/{selected_resume}"
-                jd_path = f"temp_files/{jd_file.name}"
+            resume_text = results_store.resume_text(job.id, selected_resume)
+            jd_text = st.session_state.documents[st.session_state.jd_hash]["text"]
 
-                resume_text = "\n".join([doc.page_content for doc in load_and_split_resume(resume_path)])
-                jd_text = "\n".join([doc.page_content for doc in load_and_split_resume(jd_path)])
+            # Only the excerpts most relevant to the question go into the prompt
+            context = select_chat_context(
+                resume_text, jd_text, user_prompt, summary=results_store.detail(job.id, selected_resume)["Summary"]
+            )
 
-                ai_response = answer_resume_query(
+            # Render the answer as it streams in
+            st.chat_message("user").markdown(user_prompt)
+            with st.chat_message("assistant"), trace_span("chat", selected_resume):
+                ai_response = st.write_stream(stream_resume_query(
                     resume_text=resume_text,
                     jd_text=jd_text,
                     user_question=user_prompt,
-                    model=selected_model
-                )
+                    model=selected_model,
+                    context=context
+                ))
+                with st.expander(f"📎 Context used from {selected_resume} ({len(context['chunks'])} excerpts, ~{context['tokens']} tokens)"):
+                    if context["summary"]:
+                        st.caption("Includes the cached resume summary.")
+                    for chunk, score in context["chunks"]:
+                        label = "Resume" if chunk.source == "resume" else "Job description"
+                        st.markdown(f"**{label} · chunk {chunk.id}** (relevance {score:.2f})\n\n{chunk.text}")
 
             # 🔥 Auto-generate session title from first question
             if st.session_state.current_session is None:
-                slug = slugify(user_prompt)
                 title_readable = " ".join(user_prompt.strip().split()[:6]).capitalize()
-                file_name = f"chat_{slug}.json"
-                st.session_state.current_session = file_name
+                st.session_state.current_session = chat_store.create_session(title_readable)
                 st.session_state.session_title = title_readable
 
-                # Save a metadata file mapping filename → title
-                meta = {"title": title_readable}
-                with open(os.path.join("chat_history", file_name.replace('.json', '_meta.json')), "w") as f:
-                    json.dump(meta, f)
-
-            # ✅ Save chat
-            chat_pair = {"user": user_prompt, "assistant": ai_response}
-            st.session_state.chat_history.append(chat_pair)
-            save_chat_to_file(st.session_state.chat_history, st.session_state.current_session)
-
-            # Show messages
-            st.chat_message("user").markdown(user_prompt)
-            st.chat_message("assistant").markdown(ai_response)
+            # ✅ Save chat (a single appended row)
+            chat_store.append_message(st.session_state.current_session, user_prompt, ai_response)
 
         except Exception as e:
             st.error(f"⚠️ Failed to process chat. Error: {str(e)}")
@@ -600,5 +628,12 @@ if user_prompt:
 
 
 if st.button("🧹 Clear Chat History"):
-    st.session_state.chat_history = []
-    st.success("Chat history cleared.")
+    # Starts a fresh chat; the saved session stays in the sidebar list
+    st.session_state.current_session = None
+    st.session_state.session_title = None
+    st.toast("Chat history cleared.")
+    st.rerun()
+
+
+# Started after the page is drawn so the first paint doesn't compete with it
+start_warm_up()
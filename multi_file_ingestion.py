@@ -1,25 +1,164 @@
+import codecs
+import hashlib
 import os
-from langchain_community.document_loaders import (
-    TextLoader,
-    PyPDFLoader,
-    UnstructuredWordDocumentLoader,
-    UnstructuredFileLoader,
-)
+import tempfile
+import threading
+from collections import OrderedDict
 
+from pdf_extract import get_backend, iter_pages, timing_report
+from tracing import record_cache_hit, record_pdf, span
 
-def load_and_split_resume(file_path: str):
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
 
-    ext = os.path.splitext(file_path)[1].lower()
+# Parsed documents are cached by file content so repeat loads skip the parser
+DOC_CACHE_MAX_BYTES = int(os.getenv("HIRELY_DOC_CACHE_MB", "64")) * 1024 * 1024
+
+# Only formats whose loaders need a real path are written to disk (None = system temp dir)
+SPILL_DIR = os.getenv("HIRELY_SPILL_DIR") or None
+
+_doc_cache = OrderedDict()
+_doc_cache_bytes = 0
+_doc_cache_lock = threading.Lock()
+
+
+def content_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bytes_hash(data) -> str:
+    # Works on bytes or a memoryview without copying
+    return hashlib.sha256(data).hexdigest()
+
+
+def _documents_size(documents) -> int:
+    return sum(len(doc.page_content) for doc in documents)
+
+
+def _cache_get(key):
+    with _doc_cache_lock:
+        entry = _doc_cache.get(key)
+        if entry is None:
+            return None
+        _doc_cache.move_to_end(key)
+        return list(entry[0])
+
+
+def _cache_put(key, documents):
+    global _doc_cache_bytes
+    size = _documents_size(documents)
+    if size > DOC_CACHE_MAX_BYTES:
+        return
+
+    with _doc_cache_lock:
+        if key in _doc_cache:
+            _doc_cache_bytes -= _doc_cache.pop(key)[1]
+        _doc_cache[key] = (list(documents), size)
+        _doc_cache_bytes += size
+        while _doc_cache_bytes > DOC_CACHE_MAX_BYTES:
+            _, (_, evicted_size) = _doc_cache.popitem(last=False)
+            _doc_cache_bytes -= evicted_size
+
+
+def clear_document_cache():
+    global _doc_cache_bytes
+    with _doc_cache_lock:
+        _doc_cache.clear()
+        _doc_cache_bytes = 0
+
+
+def _load_pdf(source, name: str):
+    # One Document per page, like PyPDFLoader, plus per-page extraction timing
+    from langchain_core.documents import Document
+
+    backend = get_backend()
+    pages = list(iter_pages(source, backend))
+    record_pdf(timing_report(pages, backend))
+    return [
+        Document(
+            page_content=page.text,
+            metadata={
+                "source": name,
+                "page": page.number,
+                "extract_seconds": round(page.seconds, 6),
+                "extract_backend": backend.name,
+            },
+        )
+        for page in pages
+    ]
+
+
+def _load_documents(file_path: str, ext: str):
+    if ext == ".pdf":
+        return _load_pdf(file_path, file_path)
+
+    # Loaders are imported on first use; Unstructured is only needed for Word and other formats
     if ext == ".txt":
+        from langchain_community.document_loaders import TextLoader
         loader = TextLoader(file_path, encoding="utf-8")
-    elif ext == ".pdf":
-        loader = PyPDFLoader(file_path)
     elif ext in [".docx", ".doc"]:
+        from langchain_community.document_loaders import UnstructuredWordDocumentLoader
         loader = UnstructuredWordDocumentLoader(file_path)
     else:
+        from langchain_community.document_loaders import UnstructuredFileLoader
         loader = UnstructuredFileLoader(file_path)
 
-    documents = loader.load()
-    return documents
\ No newline at end of file
+    return loader.load()
+
+
+def load_and_split_resume(file_path: str, use_cache: bool = True):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    ext = os.path.splitext(file_path)[1].lower()
+    with span("ingest", resume=os.path.basename(file_path)):
+        if not use_cache:
+            return _load_documents(file_path, ext)
+
+        key = (content_hash(file_path), ext)
+        documents = _cache_get(key)
+        if documents is None:
+            documents = _load_documents(file_path, ext)
+            _cache_put(key, documents)
+        else:
+            record_cache_hit()
+        return documents
+
+
+def _load_bytes(data, file_name: str, ext: str):
+    if ext == ".pdf":
+        return _load_pdf(bytes(data), file_name)
+    if ext == ".txt":
+        from langchain_core.documents import Document
+        return [Document(page_content=codecs.decode(data, "utf-8"), metadata={"source": file_name})]
+
+    # Unstructured loaders read from a path, so spill to a temp file just for them
+    with tempfile.NamedTemporaryFile(suffix=ext, dir=SPILL_DIR, delete=False) as f:
+        f.write(data)
+        spill_path = f.name
+    try:
+        documents = _load_documents(spill_path, ext)
+    finally:
+        os.remove(spill_path)
+    for doc in documents:
+        doc.metadata["source"] = file_name
+    return documents
+
+
+def load_and_split_bytes(data, file_name: str, content_key: str = None, use_cache: bool = True):
+    # data is bytes or a memoryview (e.g. UploadedFile.getbuffer()); nothing touches disk for PDF/TXT
+    ext = os.path.splitext(file_name)[1].lower()
+    with span("ingest", resume=file_name):
+        if not use_cache:
+            return _load_bytes(data, file_name, ext)
+
+        key = (content_key or bytes_hash(data), ext)
+        documents = _cache_get(key)
+        if documents is None:
+            documents = _load_bytes(data, file_name, ext)
+            _cache_put(key, documents)
+        else:
+            record_cache_hit()
+        return documents
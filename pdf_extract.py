@@ -0,0 +1,241 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Fastest first; HIRELY_PDF_BACKEND forces one
+BACKEND_ORDER = ["pypdfium2", "pymupdf", "pypdf", "pdfplumber"]
+PDF_BACKEND = os.getenv("HIRELY_PDF_BACKEND")
+
+# PDFs with at least this many pages are split across worker processes. Measured on CV-like pages:
+# pypdfium2 reads ~2.4 ms/page, pdfplumber ~220 ms/page, and a warm pool round trip costs ~8 ms, so
+# 4 workers break even at ~5 pages with pdfium (1-2 with the pure-Python backends); 16 leaves margin
+# for re-opening the document in each worker. The ~340 ms pool start is paid in warm_pool().
+PARALLEL_MIN_PAGES = int(os.getenv("HIRELY_PDF_PARALLEL_PAGES", "16"))
+PDF_WORKERS = int(os.getenv("HIRELY_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+PageText = namedtuple("PageText", ["number", "text", "seconds"])
+
+
+def _timed_pages(get_page_text, start, stop):
+    # A generator: each page is extracted only when the caller asks for it
+    for number in range(start, stop):
+        started = time.perf_counter()
+        text = get_page_text(number) or ""
+        yield PageText(number, text, time.perf_counter() - started)
+
+
+class _Pdfium:
+    name = "pypdfium2"
+    # pdfium keeps global state, so in-process calls are serialized
+    thread_safe = False
+
+    def __init__(self):
+        import pypdfium2
+        self.pdfium = pypdfium2
+
+    def page_count(self, source):
+        pdf = self.pdfium.PdfDocument(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract(self, source, start, stop):
+        pdf = self.pdfium.PdfDocument(source)
+
+        def page_text(number):
+            page = pdf[number]
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+
+        try:
+            yield from _timed_pages(page_text, start, stop)
+        finally:
+            pdf.close()
+
+
+class _PyMuPDF:
+    name = "pymupdf"
+    thread_safe = False
+
+    def __init__(self):
+        import fitz
+        self.fitz = fitz
+
+    def _open(self, source):
+        if isinstance(source, bytes):
+            return self.fitz.open(stream=source, filetype="pdf")
+        return self.fitz.open(source)
+
+    def page_count(self, source):
+        with self._open(source) as doc:
+            return doc.page_count
+
+    def extract(self, source, start, stop):
+        with self._open(source) as doc:
+            yield from _timed_pages(lambda number: doc[number].get_text(), start, stop)
+
+
+class _PyPDF:
+    name = "pypdf"
+    thread_safe = True
+
+    def __init__(self):
+        import pypdf
+        self.pypdf = pypdf
+
+    def _open(self, source):
+        return self.pypdf.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    def page_count(self, source):
+        return len(self._open(source).pages)
+
+    def extract(self, source, start, stop):
+        reader = self._open(source)
+        yield from _timed_pages(lambda number: reader.pages[number].extract_text(), start, stop)
+
+
+class _PdfPlumber:
+    name = "pdfplumber"
+    thread_safe = True
+
+    def __init__(self):
+        import pdfplumber
+        self.pdfplumber = pdfplumber
+
+    def _open(self, source):
+        return self.pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    def page_count(self, source):
+        with self._open(source) as pdf:
+            return len(pdf.pages)
+
+    def extract(self, source, start, stop):
+        with self._open(source) as pdf:
+            yield from _timed_pages(lambda number: pdf.pages[number].extract_text(), start, stop)
+
+
+_BACKENDS = {
+    "pypdfium2": _Pdfium,
+    "pymupdf": _PyMuPDF,
+    "pypdf": _PyPDF,
+    "pdfplumber": _PdfPlumber,
+}
+
+_backend = None
+_inproc_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_backend(name=PDF_BACKEND):
+    global _backend
+    if name:
+        return _BACKENDS[name]()
+    if _backend is None:
+        for candidate in BACKEND_ORDER:
+            try:
+                _backend = _BACKENDS[candidate]()
+                break
+            except ImportError:
+                continue
+        else:
+            raise ImportError("No PDF backend installed (tried: " + ", ".join(BACKEND_ORDER) + ")")
+    return _backend
+
+
+def _extract_range(backend_name, source, start, stop):
+    # Runs inside a worker process; the pages go back to the parent as one list
+    return list(get_backend(backend_name).extract(source, start, stop))
+
+
+def _load_backend(backend_name):
+    # Runs inside a worker process
+    return get_backend(backend_name).name
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the app process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def warm_pool():
+    # Starts the workers and loads the backend in them ahead of the first large PDF
+    if PDF_WORKERS < 2:
+        return
+    backend = get_backend()
+    pool = _get_pool()
+    for future in [pool.submit(_load_backend, backend.name) for _ in range(PDF_WORKERS)]:
+        future.result()
+
+
+def _in_process(backend, method, *args):
+    if backend.thread_safe:
+        return getattr(backend, method)(*args)
+    with _inproc_lock:
+        return getattr(backend, method)(*args)
+
+
+def _local_pages(backend, source, start, stop):
+    # Backends that aren't thread-safe hold the lock per page, not for the whole document,
+    # so other uploads interleave and each page reaches the caller as soon as it is read
+    pages = backend.extract(source, start, stop)
+    if backend.thread_safe:
+        yield from pages
+        return
+    try:
+        while True:
+            with _inproc_lock:
+                page = next(pages, None)
+            if page is None:
+                return
+            yield page
+    finally:
+        with _inproc_lock:
+            pages.close()
+
+
+def iter_pages(source, backend=None):
+    # source is a file path or the PDF bytes; pages are yielded in order as they become available
+    backend = backend or get_backend()
+    if isinstance(source, (bytearray, memoryview)):
+        source = bytes(source)
+    count = _in_process(backend, "page_count", source)
+
+    if count < PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+        yield from _local_pages(backend, source, 0, count)
+        return
+
+    chunk = -(-count // PDF_WORKERS)
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_range, backend.name, source, start, min(start + chunk, count))
+        for start in range(0, count, chunk)
+    ]
+    for future in futures:
+        yield from future.result()
+
+
+def timing_report(pages, backend=None):
+    # Per-page extraction timing of one document, attached to its ingest trace span
+    seconds = [page.seconds for page in pages]
+    return {
+        "backend": (backend or get_backend()).name,
+        "pages": len(pages),
+        "total_seconds": round(sum(seconds), 4),
+        "slowest_page": max(range(len(pages)), key=lambda i: seconds[i]) + 1 if pages else None,
+        "per_page_seconds": [round(s, 4) for s in seconds],
+    }
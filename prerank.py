@@ -0,0 +1,86 @@
+import re
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "our", "that", "the", "their", "this", "to", "we", "will",
+    "with", "you", "your", "who", "what", "can", "able", "etc", "also",
+}
+
+
+def tokenize(text):
+    return [
+        token.rstrip(".")
+        for token in TOKEN_RE.findall(text.lower())
+        if token.rstrip(".") and token.rstrip(".") not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    # Okapi BM25 over an inverted index stored as flat NumPy arrays (CSR by term)
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+
+        term_ids, doc_ids, counts = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            tf = {}
+            for token in tokens:
+                term_id = self.vocab.setdefault(token, len(self.vocab))
+                tf[term_id] = tf.get(term_id, 0) + 1
+            term_ids.extend(tf.keys())
+            doc_ids.extend([doc_id] * len(tf))
+            counts.extend(tf.values())
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        self.postings_docs = np.asarray(doc_ids, dtype=np.int64)[order]
+        self.postings_tf = np.asarray(counts, dtype=np.float32)[order]
+
+        doc_freq = np.bincount(term_ids, minlength=len(self.vocab))
+        self.offsets = np.concatenate(([0], np.cumsum(doc_freq)))
+
+        n_docs = len(texts)
+        self.n_docs = n_docs
+        self.idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        avg_length = doc_lengths.mean() if n_docs else 0.0
+        self.length_norm = k1 * (1 - b + b * doc_lengths / (avg_length or 1.0))
+
+    def score(self, query_text):
+        term_ids = sorted({self.vocab[token] for token in tokenize(query_text) if token in self.vocab})
+        if not term_ids or not self.n_docs:
+            return np.zeros(self.n_docs, dtype=np.float32)
+
+        slices = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        positions = np.concatenate(slices)
+        idf = np.repeat(self.idf[term_ids], [len(s) for s in slices])
+
+        docs = self.postings_docs[positions]
+        tf = self.postings_tf[positions]
+        weights = idf * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+        return np.bincount(docs, weights=weights, minlength=self.n_docs).astype(np.float32)
+
+
+def prerank(texts, jd_text):
+    # Scores relative to the best resume, on a 0-100 scale
+    raw = BM25Index(texts).score(jd_text)
+    best = raw.max() if len(raw) else 0.0
+    return raw / best * 100 if best > 0 else raw
+
+
+def shortlist(names, texts, jd_text, top_k=0, min_score=0.0):
+    scores = prerank(texts, jd_text)
+    order = np.argsort(-scores, kind="stable")
+    if top_k:
+        order = order[:top_k]
+    ranked = {names[i]: round(float(scores[i]), 2) for i in range(len(names))}
+    kept = [names[i] for i in order if scores[i] >= min_score]
+    return kept, ranked
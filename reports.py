@@ -0,0 +1,115 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Rendered reports are cached by content, so repeat downloads skip rendering
+REPORT_CACHE_ENTRIES = int(os.getenv("HIRELY_REPORT_CACHE_ENTRIES", "256"))
+REPORT_WORKERS = int(os.getenv("HIRELY_REPORT_WORKERS", "4"))
+
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def clean_unicode(text):
+    return (
+        text.encode("ascii", "ignore")
+            .decode("ascii")
+            .replace("•", "-")
+            .replace("–", "-")
+            .replace("—", "-")
+    )
+
+
+def format_score(score):
+    return "failed" if score is None else f"{score}%"
+
+
+def render_pdf(candidate_name, avg_score, scores, summary, skills, suggestions):
+    # Imported on first report so app start doesn't pay for it
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, txt="Hirely Pro - Resume Match Report", ln=True, align="C")
+
+    pdf.set_font("Arial", size=12)
+    pdf.ln(10)
+    pdf.cell(200, 10, txt=f"Candidate: {clean_unicode(candidate_name)}", ln=True)
+    pdf.cell(200, 10, txt=f"Average Match Score: {format_score(avg_score)}", ln=True)
+
+    pdf.ln(5)
+    pdf.cell(200, 10, txt="Model Scores:", ln=True)
+    for model, score in scores.items():
+        pdf.cell(200, 10, txt=f"{model}: {format_score(score)}", ln=True)
+
+    pdf.ln(5)
+    pdf.multi_cell(0, 10, f"Summary:\n{clean_unicode(summary)}")
+    pdf.ln(2)
+    pdf.multi_cell(0, 10, f"Missing Skills:\n{clean_unicode(skills)}")
+    pdf.ln(2)
+    pdf.multi_cell(0, 10, f"Suggestions:\n{clean_unicode(suggestions)}")
+
+    # pyfpdf returns a latin-1 str for dest="S", fpdf2 returns a bytearray
+    output = pdf.output(dest="S")
+    return output.encode("latin-1") if isinstance(output, str) else bytes(output)
+
+
+def report_key(candidate_name, avg_score, scores, summary, skills, suggestions):
+    payload = json.dumps(
+        [candidate_name, avg_score, scores, summary, skills, suggestions],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generate_pdf(candidate_name, avg_score, scores, summary, skills, suggestions):
+    key = report_key(candidate_name, avg_score, scores, summary, skills, suggestions)
+    with _report_cache_lock:
+        if key in _report_cache:
+            _report_cache.move_to_end(key)
+            return _report_cache[key]
+
+    pdf_bytes = render_pdf(candidate_name, avg_score, scores, summary, skills, suggestions)
+
+    with _report_cache_lock:
+        _report_cache[key] = pdf_bytes
+        while len(_report_cache) > REPORT_CACHE_ENTRIES:
+            _report_cache.popitem(last=False)
+    return pdf_bytes
+
+
+def clear_report_cache():
+    with _report_cache_lock:
+        _report_cache.clear()
+
+
+def generate_reports_zip(all_scores, max_workers=REPORT_WORKERS):
+    # Render every report in parallel and pack them into one in-memory ZIP
+    def render(item):
+        name, res = item
+        return name, generate_pdf(
+            res["Candidate"],
+            res["Avg"],
+            res["Scores"],
+            res["Summary"],
+            res["Skills"],
+            res["Suggestions"]
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        reports = list(pool.map(render, all_scores.items()))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf_bytes in reports:
+            archive.writestr(f"{name}_report.pdf", pdf_bytes)
+    return buffer.getvalue()
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+
+from sqlite_db import connect
+
+
+RESULTS_DB_PATH = os.getenv("HIRELY_RESULTS_DB", os.path.join(".cache", "results.sqlite"))
+
+# Rows older than this are dropped when the store opens; their jobs can't be reattached anymore
+RESULTS_TTL = float(os.getenv("HIRELY_JOB_TTL", "3600"))
+
+# Column each sortable table key maps to; failed scores always sort last
+SORT_COLUMNS = {
+    "Avg Score": "avg",
+    "Pre-rank": "prerank",
+    "Resume File": "name",
+    "Candidate": "candidate",
+    "Upload order": "position",
+}
+
+SUMMARY_COLUMNS = "name, candidate, avg, scores, failed, prerank"
+
+
+class ResultsStore:
+    # Per-job analysis results in SQLite: the UI pages through sorted rows and loads details on demand
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        if self._db is None:
+            db = connect(self.path, """
+                CREATE TABLE IF NOT EXISTS results (
+                    job_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    candidate TEXT,
+                    avg REAL,
+                    scores TEXT NOT NULL,
+                    failed TEXT NOT NULL,
+                    prerank REAL,
+                    summary TEXT,
+                    skills TEXT,
+                    missing_skills TEXT,
+                    suggestions TEXT,
+                    resume_text TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, name)
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_avg ON results(job_id, avg);
+                CREATE INDEX IF NOT EXISTS idx_results_created ON results(created_at);
+            """, pragmas=("synchronous=NORMAL",))
+            db.execute("DELETE FROM results WHERE created_at < ?", (time.time() - RESULTS_TTL,))
+            db.commit()
+            self._db = db
+        return self._db
+
+    def put(self, job_id, position, name, entry, resume_text=None, prerank=None):
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, name, position, entry["Candidate"], entry["Avg"],
+                    json.dumps(entry["Scores"]), json.dumps(entry["Failed"]), prerank,
+                    entry["Summary"], entry["Skills"], json.dumps(entry["MissingSkills"]), entry["Suggestions"],
+                    resume_text, time.time(),
+                ),
+            )
+            db.commit()
+
+    @staticmethod
+    def _where(job_id, search=None, min_score=None, failed_only=False):
+        clauses = ["job_id = ?"]
+        params = [job_id]
+        if search:
+            clauses.append("(name LIKE ? OR candidate LIKE ?)")
+            params += [f"%{search}%"] * 2
+        if min_score:
+            clauses.append("avg >= ?")
+            params.append(min_score)
+        if failed_only:
+            clauses.append("failed != '[]'")
+        return " AND ".join(clauses), params
+
+    def count(self, job_id, search=None, min_score=None, failed_only=False):
+        where, params = self._where(job_id, search, min_score, failed_only)
+        with self._lock:
+            return self._conn().execute(f"SELECT COUNT(*) FROM results WHERE {where}", params).fetchone()[0]
+
+    def page(self, job_id, sort="Avg Score", descending=True, offset=0, limit=50, search=None, min_score=None):
+        # Sorted, filtered and sliced in SQL; detail text stays in the database
+        column = SORT_COLUMNS[sort]
+        where, params = self._where(job_id, search, min_score)
+        order = f"{column} IS NULL, {column} {'DESC' if descending else 'ASC'}, position"
+        with self._lock:
+            rows = self._conn().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM results WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [
+            {
+                "Resume File": row[0],
+                "Candidate": row[1],
+                "Avg Score": row[2],
+                **json.loads(row[3]),
+                "Failed": ", ".join(json.loads(row[4])),
+                "Pre-rank": row[5],
+            }
+            for row in rows
+        ]
+
+    def histogram(self, job_id, bucket=10):
+        # Score distribution aggregated in SQL, so the chart is the same size for 10 or 10,000 resumes
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT MIN(CAST(avg / ? AS INTEGER) * ?, 100 - ?), COUNT(*) FROM results "
+                "WHERE job_id = ? AND avg IS NOT NULL GROUP BY 1 ORDER BY 1",
+                (bucket, bucket, bucket, job_id),
+            ).fetchall()
+        return [{"Score": f"{low:g}–{low + bucket:g}", "Resumes": count} for low, count in rows]
+
+    def detail(self, job_id, name):
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT candidate, avg, scores, failed, prerank, summary, skills, missing_skills, suggestions "
+                "FROM results WHERE job_id = ? AND name = ?",
+                (job_id, name),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "Candidate": row[0],
+            "Avg": row[1],
+            "Scores": json.loads(row[2]),
+            "Failed": json.loads(row[3]),
+            "PreRank": row[4],
+            "Summary": row[5],
+            "Skills": row[6],
+            "MissingSkills": json.loads(row[7]),
+            "Suggestions": row[8],
+        }
+
+    def details(self, job_id, names):
+        return {name: entry for name in names if (entry := self.detail(job_id, name)) is not None}
+
+    def resume_text(self, job_id, name):
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT resume_text FROM results WHERE job_id = ? AND name = ?", (job_id, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete_job(self, job_id):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            db.commit()
+
+
+results_store = ResultsStore()
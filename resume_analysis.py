@@ -0,0 +1,486 @@
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from analysis_store import ANALYSIS_FIELDS, FIELD_INPUTS
+from jd_digest import format_digest, get_jd_digest
+from llm_client import complete, parse_json_reply, stream
+from llm_scheduler import INTERACTIVE, request_lane
+from retrieval import estimate_tokens, get_index, select_chunks
+from scoring import SCORING_MODELS, order_scores, scoring
+from skill_extractor import format_skill_bullets, merge_skills, missing_skills
+from tracing import span, traced
+
+
+# Max number of LLM calls in flight during Analyze Fit
+MAX_CONCURRENCY = int(os.getenv("HIRELY_MAX_CONCURRENCY", "8"))
+
+# Use one structured completion per resume instead of the per-field prompts
+BUNDLE_MODE = os.getenv("HIRELY_ANALYSIS_BUNDLE", "1") == "1"
+
+# Skill gaps come from the local taxonomy; the LLM only adds to them when enabled
+SKILL_GAP_LLM = os.getenv("HIRELY_SKILL_GAP_LLM", "0") == "1"
+
+# Chat prompts carry only the excerpts most relevant to the question, within this budget
+CHAT_CONTEXT_TOKENS = int(os.getenv("HIRELY_CHAT_CONTEXT_TOKENS", "1500"))
+CHAT_TOP_K = int(os.getenv("HIRELY_CHAT_TOP_K", "6"))
+
+# "full" puts the JD text after its digest in the shared prefix; "digest" sends only the digest
+JD_PROMPT_MODE = os.getenv("HIRELY_JD_PROMPT_MODE", "full")
+
+logger = logging.getLogger("hirely")
+
+# Where helper failures are surfaced; a thread can override it (e.g. a background job's error list)
+error_handler = logger.error
+_local = threading.local()
+
+
+def set_thread_error_handler(handler):
+    _local.error_handler = handler
+
+
+def report_error(message):
+    handler = getattr(_local, "error_handler", None) or error_handler
+    handler(message)
+
+
+# Candidate name extractor using Groq
+def extract_candidate_name(resume_text):
+    prompt = f"""
+You are an AI assistant specialized in resume analysis.
+Your task is to get full name of the candidate from the resume.
+Resume:
+{resume_text}
+Respond with only the candidate's full name.
+"""
+    try:
+        return complete("groq", "llama3-8b-8192", [
+            {"role": "system", "content": "You are a professional resume evaluator."},
+            {"role": "user", "content": prompt}
+        ])
+    except Exception as e:
+        report_error(f"⚠️ Error: {e}")
+        return "Unknown"
+
+# Every JD-dependent prompt opens with the same system message (instructions, digest, JD), so
+# providers can reuse its cached prefix across resumes; the resume and the task come last.
+# Chat leaves the JD text out and retrieves JD excerpts instead, to stay within its context budget.
+def jd_system_message(jd_text, include_jd=True):
+    sections = [
+        "You are an AI assistant specialized in resume analysis and recruitment.",
+        "Every request concerns the job below. The candidate's resume and the task follow in the user message.",
+        f"Requirements digest:\n{format_digest(get_jd_digest(jd_text))}",
+    ]
+    if include_jd and JD_PROMPT_MODE != "digest":
+        sections.append(f"Job Description:\n{jd_text.strip()}")
+    return {"role": "system", "content": "\n\n".join(sections)}
+
+
+def jd_messages(jd_text, prompt, include_jd=True):
+    return [jd_system_message(jd_text, include_jd), {"role": "user", "content": prompt.strip()}]
+
+
+# Prompt builder
+def build_prompt(resume_text, jd_text):
+    return jd_messages(jd_text, f"""
+Resume:
+{resume_text}
+
+Analyze the resume and compare it with the job description.
+Provide a match percentage between 0 and 100.
+Respond with only the match percentage as an integer.
+""")
+
+# Skill gap analysis (LLM enrichment)
+def llm_skill_gap(resume_text, jd_text):
+    prompt = f"""
+Resume:
+{resume_text}
+
+As an expert HR AI, find out which skills are missing in the resume based on the job description.
+List the missing skills only as bullet points.
+"""
+    try:
+        return complete("groq", "llama3-8b-8192", jd_messages(jd_text, prompt)).splitlines()
+    except Exception as e:
+        report_error(f"⚠️ Error: {e}")
+        return []
+
+
+# Structured skill gap: taxonomy matches, optionally enriched by the LLM
+def skill_gap(resume_text, jd_text, enrich=SKILL_GAP_LLM, llm_skills=None):
+    skills = missing_skills(resume_text, jd_text)
+    if enrich:
+        if llm_skills is None:
+            llm_skills = llm_skill_gap(resume_text, jd_text)
+        skills = merge_skills(skills, llm_skills)
+    return skills
+
+
+def extract_skill_gap(resume_text, jd_text, enrich=SKILL_GAP_LLM):
+    return format_skill_bullets(skill_gap(resume_text, jd_text, enrich))
+
+
+#AI Chat assistant for Resume Feedback
+
+def select_chat_context(resume_text, jd_text, user_question, summary=None,
+                        budget_tokens=CHAT_CONTEXT_TOKENS, top_k=CHAT_TOP_K):
+    # Retrieved resume/JD excerpts plus the cached summary; the UI lists the chunks it used.
+    # The digest-only system message and the question are sent too, so they come out of the budget
+    # first and "tokens" counts them.
+    if summary in (None, FAILED_VALUES["Summary"]):
+        summary = None
+    summary_tokens = estimate_tokens(summary) if summary else 0
+    prefix_tokens = estimate_tokens(jd_system_message(jd_text, include_jd=False)["content"])
+    fixed_tokens = prefix_tokens + estimate_tokens(user_question)
+    chunks, tokens = select_chunks(
+        get_index(resume_text, jd_text), user_question, max(0, budget_tokens - fixed_tokens - summary_tokens), top_k
+    )
+    return {"summary": summary, "chunks": chunks, "tokens": tokens + summary_tokens + fixed_tokens}
+
+
+def format_chat_context(context):
+    sections = []
+    if context["summary"]:
+        sections.append(f"Candidate summary:\n{context['summary']}")
+    for source, title in (("resume", "Resume excerpts"), ("jd", "Job description excerpts")):
+        excerpts = [f"- {chunk.text}" for chunk, _ in context["chunks"] if chunk.source == source]
+        if excerpts:
+            sections.append(f"{title}:\n" + "\n".join(excerpts))
+    return "\n\n".join(sections)
+
+
+def build_chat_request(resume_text, jd_text, user_question, model="groq", context=None):
+    if context is None:
+        context = select_chat_context(resume_text, jd_text, user_question)
+    prompt = f"""
+{format_chat_context(context)}
+
+A candidate has asked a question about improving their resume based on the job description.
+Only the parts of the resume most relevant to the question are included above.
+
+Question:
+{user_question}
+
+Answer as a professional resume coach, like a friendly career coach. Include examples, avoid generic advice, and use a helpful, human tone.
+"""
+    messages = jd_messages(jd_text, prompt, include_jd=False)
+    if model == "groq":
+        return "groq", "llama3-8b-8192", messages
+    return "gemini", "gemini-2.0-flash", messages
+
+
+def answer_resume_query(resume_text, jd_text, user_question, model="groq", context=None):
+    try:
+        return complete(*build_chat_request(resume_text, jd_text, user_question, model, context))
+    except Exception as e:
+        return f"⚠️ Error: {e}"
+
+
+# Same answer, yielded token by token for the chat UI
+def stream_resume_query(resume_text, jd_text, user_question, model="groq", context=None):
+    try:
+        # Chat goes ahead of queued analysis and batch calls
+        with request_lane(INTERACTIVE):
+            yield from stream(*build_chat_request(resume_text, jd_text, user_question, model, context))
+    except Exception as e:
+        yield f"⚠️ Error: {e}"
+
+
+# Resume improvement suggestions
+def suggest_improvements(resume_text, jd_text):
+    prompt = f"""
+Resume:
+{resume_text}
+
+As a career advisor AI, provide 3 personalized suggestions to improve the resume to better match the job.
+List only 3 improvement suggestions.
+"""
+    try:
+        return complete("groq", "llama3-8b-8192", jd_messages(jd_text, prompt))
+    except Exception as e:
+        report_error(f"⚠️ Error: {e}")
+
+        return "N/A"
+
+
+# Resume summary
+def generate_summary(resume_text):
+    prompt = f"""
+Summarize the resume in 3 short bullet points. Highlight top achievements and strengths.
+
+Resume:
+{resume_text}
+"""
+    try:
+        return complete("groq", "llama3-8b-8192", [{"role": "user", "content": prompt}])
+    except Exception as e:
+        report_error(f"⚠️ Error: {e}")
+
+        return "N/A"
+
+
+# Get match scores
+
+# One score per configured model; a failed score is None, never 0, so it can't drag a ranking down
+def get_match_scores(messages, models=None, known=None):
+    return scoring.score(messages, models, known, on_error=report_error)
+
+
+def average_score(scores):
+    valid = [score for score in scores.values() if score is not None]
+    return round(sum(valid) / len(valid), 2) if valid else None
+
+
+def failed_models(scores):
+    return [model for model, score in scores.items() if score is None]
+
+# Single structured analysis call (name, summary, skills, suggestions, score)
+ANALYSIS_BUNDLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "candidate_name": {"type": "string"},
+        "summary": {"type": "array", "items": {"type": "string"}},
+        "missing_skills": {"type": "array", "items": {"type": "string"}},
+        "suggestions": {"type": "array", "items": {"type": "string"}},
+        "match_score": {"type": "integer"},
+    },
+    "required": ["candidate_name", "summary", "missing_skills", "suggestions", "match_score"],
+}
+
+
+def build_bundle_prompt(resume_text, jd_text):
+    return jd_messages(jd_text, f"""
+Resume:
+{resume_text}
+
+Analyze the resume against the job description and respond with a JSON object containing:
+- "candidate_name": the candidate's full name
+- "summary": 3 short bullet points highlighting top achievements and strengths
+- "missing_skills": skills required by the job description that are missing from the resume
+- "suggestions": 3 personalized suggestions to improve the resume for this job
+- "match_score": the match percentage between 0 and 100 as an integer
+""")
+
+
+def parse_analysis_bundle(content):
+    data = parse_json_reply(content)
+
+    name = data.get("candidate_name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("candidate_name missing")
+    for field in ("summary", "missing_skills", "suggestions"):
+        if not isinstance(data.get(field), list) or not all(isinstance(item, str) for item in data[field]):
+            raise ValueError(f"{field} must be a list of strings")
+    score = data.get("match_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise ValueError("match_score must be a number")
+
+    return {
+        "Candidate": name.strip(),
+        "Summary": "\n".join(f"- {item}" for item in data["summary"]),
+        "SkillList": data["missing_skills"],
+        "Suggestions": "\n".join(f"{i}. {item}" for i, item in enumerate(data["suggestions"], 1)),
+        "Score": max(0, min(int(score), 100)),
+    }
+
+
+def analyze_bundle(resume_text, jd_text):
+    try:
+        content = complete(
+            "gemini",
+            "gemini-2.0-flash",
+            build_bundle_prompt(resume_text, jd_text),
+            validate=parse_analysis_bundle,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "resume_analysis", "schema": ANALYSIS_BUNDLE_SCHEMA},
+            },
+        )
+        return parse_analysis_bundle(content)
+    except Exception:
+        # Caller falls back to the per-field prompts
+        return None
+
+
+# Fields the single structured call can fill in
+BUNDLE_FIELDS = ("Candidate", "Summary", "MissingSkills", "Suggestions")
+
+# The scoring model whose score the bundle call already provides, if it is configured
+BUNDLE_SCORER = next((m for m in SCORING_MODELS if (m.provider, m.model) == ("gemini", "gemini-2.0-flash")), None)
+
+# What each helper returns when its call failed; failed results are never stored
+FAILED_VALUES = {"Candidate": "Unknown", "Summary": "N/A", "Suggestions": "N/A"}
+
+
+def is_failed(field, value):
+    if field == "Scores":
+        return not value or any(score is None for score in value.values())
+    return value is None or FAILED_VALUES.get(field) == value
+
+
+# Run every per-resume LLM call on a bounded thread pool; with a store, only stale fields are computed.
+# on_result(name, entry) fires as each resume finishes; setting cancel (an Event) stops waiting and
+# drops calls that haven't started, returning the resumes finished so far. on_start(name) fires once per
+# resume, when a pool worker picks up its first call.
+def analyze_resumes(resumes, jd_text, max_workers=MAX_CONCURRENCY, bundle=BUNDLE_MODE, initializer=None,
+                    initargs=(), store=None, on_result=None, cancel=None, on_start=None):
+    def field_call(field, resume_text):
+        return {
+            "Candidate": (extract_candidate_name, resume_text),
+            "Summary": (generate_summary, resume_text),
+            "MissingSkills": (skill_gap, resume_text, jd_text),
+            "Suggestions": (suggest_improvements, resume_text, jd_text),
+        }[field]
+
+    texts = dict(resumes)
+    cached = {}
+    values = {name: {} for name in texts}
+    outstanding = {name: 0 for name in texts}
+    owners = {}
+    all_scores = {}
+
+    started = set()
+    started_lock = threading.Lock()
+
+    def starting(name, call):
+        def run(*args):
+            with started_lock:
+                first = name not in started
+                started.add(name)
+            if first:
+                on_start(name)
+            return call(*args)
+        return run
+
+    # Each helper call is traced as its own stage, attributed to the resume
+    def submit(name, field, fn, *args):
+        call = traced(fn.__name__, name, fn)
+        future = pool.submit(starting(name, call) if on_start is not None else call, *args)
+        owners[future] = (name, field)
+        outstanding[name] += 1
+
+    # Score tasks may cover only some models (the bundle scores one); their results are merged
+    def submit_fields(name, fields, score_models=None):
+        for field in fields:
+            if field != "Scores":
+                submit(name, field, *field_call(field, texts[name]))
+            elif score_models is None or score_models:
+                submit(name, field, get_match_scores, build_prompt(texts[name], jd_text), score_models)
+
+    def finish(name):
+        computed = values[name]
+        if "Scores" in computed:
+            computed["Scores"] = order_scores(computed["Scores"])
+        if store is not None:
+            store.put_fields(texts[name], jd_text, {
+                field: value for field, value in computed.items() if not is_failed(field, value)
+            })
+        computed.update(cached[name])
+
+        scores = computed["Scores"]
+        all_scores[name] = {
+            "Candidate": computed["Candidate"],
+            "Avg": average_score(scores),
+            "Scores": scores,
+            "Failed": failed_models(scores),
+            "Summary": computed["Summary"],
+            "Skills": format_skill_bullets(computed["MissingSkills"]),
+            "MissingSkills": computed["MissingSkills"],
+            "Suggestions": computed["Suggestions"]
+        }
+        if on_result is not None:
+            on_result(name, all_scores[name])
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=initializer, initargs=initargs)
+    try:
+        for name, resume_text in resumes:
+            cached[name] = store.get_fields(resume_text, jd_text) if store is not None else {}
+        # The JD digest is built once, before the JD-first prompts fan out across resumes
+        if any("jd" in FIELD_INPUTS[field] for name in texts for field in ANALYSIS_FIELDS if field not in cached[name]):
+            get_jd_digest(jd_text)
+
+        for name, resume_text in resumes:
+            stale = [field for field in ANALYSIS_FIELDS if field not in cached[name]]
+            bundled = [field for field in stale if field in BUNDLE_FIELDS]
+            # One bundle call is only worth it when it replaces several per-field calls
+            if bundle and len(bundled) > 1:
+                submit(name, "Bundle", analyze_bundle, resume_text, jd_text)
+                others = [m for m in SCORING_MODELS if m is not BUNDLE_SCORER] if BUNDLE_SCORER else None
+                submit_fields(name, [field for field in stale if field not in bundled], others)
+            else:
+                submit_fields(name, stale)
+
+        for name in texts:
+            if not outstanding[name]:
+                finish(name)
+
+        # Resumes are finished in completion order, so fast ones show up first
+        while owners and not (cancel is not None and cancel.is_set()):
+            done, _ = wait(list(owners), timeout=None if cancel is None else 0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, field = owners.pop(future)
+                outstanding[name] -= 1
+                result = future.result()
+                if field == "Bundle":
+                    bundled = [field for field in BUNDLE_FIELDS if field not in cached[name]]
+                    scored = "Scores" not in cached[name] and BUNDLE_SCORER is not None
+                    if result is None:
+                        # Fall back to the per-field prompts
+                        submit_fields(name, bundled + (["Scores"] if scored else []), [BUNDLE_SCORER])
+                    else:
+                        if scored:
+                            values[name].setdefault("Scores", {})[BUNDLE_SCORER.name] = result["Score"]
+                        with span("skill_gap", name):
+                            result["MissingSkills"] = skill_gap(texts[name], jd_text, llm_skills=result.pop("SkillList"))
+                        values[name].update({field: result[field] for field in bundled})
+                elif field == "Scores":
+                    values[name].setdefault("Scores", {}).update(result)
+                else:
+                    values[name][field] = result
+                if not outstanding[name]:
+                    finish(name)
+    finally:
+        cancelled = cancel is not None and cancel.is_set()
+        pool.shutdown(wait=not cancelled, cancel_futures=cancelled)
+
+    return {name: all_scores[name] for name in texts if name in all_scores}
+
+
+# Sequential variants used by the batch engine, which parallelizes across pairs instead
+def score_resume(resume_text, jd_text):
+    scores = get_match_scores(build_prompt(resume_text, jd_text))
+    return scores, average_score(scores)
+
+
+def analyze_resume(resume_text, jd_text, bundle=BUNDLE_MODE):
+    result = analyze_bundle(resume_text, jd_text) if bundle else None
+    if result is None:
+        scores, avg_score = score_resume(resume_text, jd_text)
+        skills = skill_gap(resume_text, jd_text)
+        return {
+            "Candidate": extract_candidate_name(resume_text),
+            "Avg": avg_score,
+            "Scores": scores,
+            "Failed": failed_models(scores),
+            "Summary": generate_summary(resume_text),
+            "Skills": format_skill_bullets(skills),
+            "MissingSkills": skills,
+            "Suggestions": suggest_improvements(resume_text, jd_text)
+        }
+
+    # The bundle's score counts towards the early-exit quorum
+    known = {BUNDLE_SCORER.name: result["Score"]} if BUNDLE_SCORER else None
+    scores = get_match_scores(build_prompt(resume_text, jd_text), known=known)
+    skills = skill_gap(resume_text, jd_text, llm_skills=result["SkillList"])
+    return {
+        "Candidate": result["Candidate"],
+        "Avg": average_score(scores),
+        "Scores": scores,
+        "Failed": failed_models(scores),
+        "Summary": result["Summary"],
+        "Skills": format_skill_bullets(skills),
+        "MissingSkills": skills,
+        "Suggestions": result["Suggestions"]
+    }
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from prerank import tokenize
+
+
+# Chunks are packed from whole lines up to this many words
+CHUNK_WORDS = int(os.getenv("HIRELY_CHUNK_WORDS", "80"))
+
+# Hashed feature space for the TF-IDF vectors
+VECTOR_DIM = int(os.getenv("HIRELY_RETRIEVAL_DIM", "4096"))
+
+# Indexed resume/JD pairs kept in memory
+INDEX_CACHE_ENTRIES = int(os.getenv("HIRELY_RETRIEVAL_CACHE_ENTRIES", "64"))
+
+Chunk = namedtuple("Chunk", ["id", "source", "text"])
+
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    # Same 4-characters-per-token rule the scheduler uses
+    return len(text) // 4 + 1
+
+
+def chunk_text(text, source, max_words=CHUNK_WORDS, start_id=0):
+    chunks = []
+    current = []
+
+    def flush():
+        if current:
+            chunks.append(Chunk(start_id + len(chunks), source, " ".join(current)))
+            current.clear()
+
+    for line in re.split(r"\n\s*", text):
+        words = line.split()
+        # Very long lines (PDFs without line breaks) are split on word boundaries
+        while len(words) > max_words:
+            flush()
+            current.extend(words[:max_words])
+            flush()
+            words = words[max_words:]
+        if len(current) + len(words) > max_words:
+            flush()
+        current.extend(words)
+    flush()
+    return chunks
+
+
+def _hash_features(text):
+    tokens = tokenize(text)
+    # Unigrams plus bigrams, hashed into a fixed-size space
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return np.fromiter((zlib.crc32(f.encode("utf-8")) % VECTOR_DIM for f in features), dtype=np.int64, count=len(features))
+
+
+class ChunkIndex:
+    # Hashing-trick TF-IDF over the chunks of one resume and one JD; cosine similarity by dot product
+    def __init__(self, chunks):
+        self.chunks = chunks
+        counts = np.zeros((len(chunks), VECTOR_DIM), dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            np.add.at(counts[row], _hash_features(chunk.text), 1.0)
+
+        doc_freq = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(chunks)) / (1 + doc_freq)) + 1).astype(np.float32)
+        self.vectors = self._normalize(np.log1p(counts) * self.idf)
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    def query_vector(self, text):
+        counts = np.zeros(VECTOR_DIM, dtype=np.float32)
+        np.add.at(counts, _hash_features(text), 1.0)
+        return self._normalize(np.log1p(counts) * self.idf)
+
+    def scores(self, text):
+        if not self.chunks:
+            return np.zeros(0, dtype=np.float32)
+        return self.vectors @ self.query_vector(text)
+
+    def search(self, text, k=5):
+        scores = self.scores(text)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(self.chunks[i], float(scores[i])) for i in order]
+
+
+def build_index(resume_text, jd_text):
+    chunks = chunk_text(resume_text, "resume")
+    chunks += chunk_text(jd_text, "jd", start_id=len(chunks))
+    return ChunkIndex(chunks)
+
+
+def get_index(resume_text, jd_text):
+    # Indexed once per resume/JD pair, then reused for every chat turn
+    key = hashlib.sha256(f"{resume_text}\0{jd_text}".encode("utf-8")).hexdigest()
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = build_index(resume_text, jd_text)
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > INDEX_CACHE_ENTRIES:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def select_chunks(index, question, budget_tokens, top_k, sources=("resume", "jd")):
+    # Best chunks for the question within the token budget; the best chunk of each source always goes first
+    ranked = [hit for hit in index.search(question, k=len(index.chunks)) if hit[0].source in sources]
+    firsts = []
+    for source in sources:
+        best = next((hit for hit in ranked if hit[0].source == source), None)
+        if best is not None:
+            firsts.append(best)
+    ordered = firsts + [hit for hit in ranked if hit not in firsts]
+
+    selected = []
+    used = 0
+    for chunk, score in ordered:
+        if len(selected) >= top_k:
+            break
+        cost = estimate_tokens(chunk.text)
+        if used + cost > budget_tokens:
+            continue
+        selected.append((chunk, score))
+        used += cost
+    # Back in document order so the excerpts read naturally
+    return sorted(selected, key=lambda hit: hit[0].id), used
@@ -0,0 +1,233 @@
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from llm_client import cached_completion, complete
+from llm_scheduler import current_lane, get_limiter, last_round_trip, request_lane
+from tracing import record_hedge
+
+
+ScoringModel = namedtuple("ScoringModel", ["name", "provider", "model"])
+
+DEFAULT_SCORING_MODELS = [
+    ScoringModel("Google Gemini", "gemini", "gemini-2.0-flash"),
+    ScoringModel("Groq LLaMA3", "groq", "llama3-70b-8192"),
+]
+
+
+def load_scoring_models():
+    # HIRELY_SCORING_MODELS: JSON list of {"name", "provider", "model"}
+    raw = os.getenv("HIRELY_SCORING_MODELS")
+    if not raw:
+        return list(DEFAULT_SCORING_MODELS)
+    return [ScoringModel(item["name"], item["provider"], item["model"]) for item in json.loads(raw)]
+
+
+SCORING_MODELS = load_scoring_models()
+
+# Accept once this many models agree within the tolerance (match points); 0 waits for every model
+SCORING_QUORUM = int(os.getenv("HIRELY_SCORING_QUORUM", "0"))
+SCORING_TOLERANCE = float(os.getenv("HIRELY_SCORING_TOLERANCE", "10"))
+
+# A second copy of a call is sent once it runs past the model's p95 latency
+HEDGE_REQUESTS = os.getenv("HIRELY_HEDGE_REQUESTS", "1") == "1"
+MIN_HEDGE_DELAY = float(os.getenv("HIRELY_MIN_HEDGE_DELAY", "0.5"))
+
+# A model is given up on after TIMEOUT_FACTOR x its p99 latency, never sooner than MIN_TIMEOUT seconds
+TIMEOUT_FACTOR = float(os.getenv("HIRELY_SCORING_TIMEOUT_FACTOR", "3"))
+MIN_TIMEOUT = float(os.getenv("HIRELY_SCORING_MIN_TIMEOUT", "10"))
+
+# Recent latencies kept per model; hedging and timeouts only start once there are enough of them
+LATENCY_WINDOW = int(os.getenv("HIRELY_LATENCY_WINDOW", "100"))
+MIN_SAMPLES = int(os.getenv("HIRELY_LATENCY_MIN_SAMPLES", "10"))
+
+SCORING_WORKERS = int(os.getenv("HIRELY_SCORING_WORKERS", "16"))
+
+# How often calls still queued (in the worker pool or behind a saturated provider) are re-checked
+SATURATED_POLL = 0.25
+
+
+def parse_score(content):
+    match = re.search(r"\d+(?:\.\d+)?", content)
+    if match is None:
+        raise ValueError(f"no match score in response: {content[:80]!r}")
+    return max(0, min(round(float(match.group())), 100))
+
+
+def order_scores(scores, models=SCORING_MODELS):
+    # Configured model order, whichever call finished first
+    order = [model.name for model in models]
+    return dict(sorted(scores.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
+
+
+class LatencyTracker:
+    # Sliding window of successful call latencies per (provider, model)
+    def __init__(self, window=LATENCY_WINDOW, min_samples=MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model, seconds):
+        with self._lock:
+            self._samples.setdefault((model.provider, model.model), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model, q):
+        with self._lock:
+            samples = list(self._samples.get((model.provider, model.model), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+    def hedge_delay(self, model):
+        p95 = self.percentile(model, 95)
+        return None if p95 is None else max(MIN_HEDGE_DELAY, p95)
+
+    def timeout(self, model):
+        p99 = self.percentile(model, 99)
+        return None if p99 is None else max(MIN_TIMEOUT, p99 * TIMEOUT_FACTOR)
+
+
+def agreed(scores, quorum, tolerance):
+    # Some `quorum` of the returned scores lie within `tolerance` of each other
+    valid = sorted(score for score in scores.values() if score is not None)
+    if not quorum or len(valid) < quorum:
+        return False
+    return any(valid[i + quorum - 1] - valid[i] <= tolerance for i in range(len(valid) - quorum + 1))
+
+
+class ScoringOrchestrator:
+    # Fans one match prompt out to every scoring model with adaptive timeouts, hedging and early exit
+    def __init__(self, models=SCORING_MODELS, quorum=SCORING_QUORUM, tolerance=SCORING_TOLERANCE,
+                 hedge=HEDGE_REQUESTS, workers=SCORING_WORKERS):
+        self.models = list(models)
+        self.quorum = quorum
+        self.tolerance = tolerance
+        self.hedge = hedge
+        self.latencies = LatencyTracker()
+        self.stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "early_exits": 0}
+        self._stats_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hirely-score")
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _submit(self, model, messages, hedge, on_start=None):
+        lane = current_lane()
+
+        def call():
+            if on_start is not None:
+                on_start()
+            # Same priority lane as the caller; a hedge skips coalescing so it really is a second request
+            with request_lane(lane):
+                last_round_trip()
+                content = complete(model.provider, model.model, messages, coalesce=not hedge, validate=parse_score)
+                # Only the provider round trip is a latency sample: queueing for the limiter and retry
+                # backoff would inflate the p95/p99 that hedging and timeouts are derived from
+                round_trip = last_round_trip()
+                if round_trip is not None:
+                    self.latencies.observe(model, round_trip)
+                return parse_score(content)
+
+        self._count("hedges" if hedge else "calls")
+        # Each worker runs in a copy of the caller's context, so LLM usage lands in the caller's trace span
+        return self._pool.submit(contextvars.copy_context().run, call)
+
+    def score(self, messages, models=None, known=None, on_error=None):
+        # {model name: score}; a failed or timed-out model is None, one skipped by early exit is left out
+        scores = dict(known or {})
+        models = [model for model in (self.models if models is None else models) if model.name not in scores]
+
+        def fail(model, message):
+            scores[model.name] = None
+            if on_error is not None:
+                on_error(f"⚠️ Error: {model.name}: {message}")
+
+        attempts = {}
+        started = {}
+        pending = {}
+        for model in models:
+            # Cache hits answer at once and stay out of the latency statistics
+            cached = cached_completion(model.provider, model.model, messages)
+            if cached is not None:
+                try:
+                    scores[model.name] = parse_score(cached)
+                    continue
+                except ValueError:
+                    pass
+            pending[model.name] = model
+            # Clocks start when the call leaves the worker queue, not when it was submitted
+            on_start = lambda name=model.name: started.setdefault(name, time.monotonic())
+            attempts[self._submit(model, messages, hedge=False, on_start=on_start)] = (model, False)
+
+        hedged = set()
+        while pending:
+            if agreed(scores, self.quorum, self.tolerance):
+                # Calls still running are left to finish in the background and fill the response cache
+                self._count("early_exits")
+                break
+
+            now = time.monotonic()
+            deadlines = []
+            for name, model in list(pending.items()):
+                if name not in started:
+                    deadlines.append(now + SATURATED_POLL)
+                    continue
+                # A rate-limited provider is throughput-bound: hedging would only add to its queue,
+                # and time spent waiting for the limiter doesn't count towards the timeout
+                if get_limiter(model.provider).saturated():
+                    started[name] = now
+                    deadlines.append(now + SATURATED_POLL)
+                    continue
+                elapsed = now - started[name]
+                timeout = self.latencies.timeout(model)
+                if timeout is not None and elapsed >= timeout:
+                    del pending[name]
+                    self._count("timeouts")
+                    fail(model, f"no score after {elapsed:.1f}s (adaptive timeout)")
+                    continue
+                if timeout is not None:
+                    deadlines.append(started[name] + timeout)
+                delay = self.latencies.hedge_delay(model) if self.hedge else None
+                if delay is not None and name not in hedged:
+                    if elapsed >= delay:
+                        hedged.add(name)
+                        record_hedge()
+                        attempts[self._submit(model, messages, hedge=True)] = (model, True)
+                    else:
+                        deadlines.append(started[name] + delay)
+            if not pending:
+                break
+
+            live = [future for future, (model, _) in attempts.items() if model.name in pending]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(live, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                model, is_hedge = attempts.pop(future)
+                if model.name not in pending:
+                    continue
+                try:
+                    scores[model.name] = future.result()
+                except Exception as e:
+                    # The other copy of a hedged call may still succeed
+                    if any(other.name == model.name for other, _ in attempts.values()):
+                        continue
+                    fail(model, e)
+                else:
+                    if is_hedge:
+                        self._count("hedge_wins")
+                del pending[model.name]
+
+        return order_scores(scores, self.models)
+
+
+# Process-wide, so latency statistics are shared by every session, job and batch worker
+scoring = ScoringOrchestrator()
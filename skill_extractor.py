@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from collections import deque
+
+
+TAXONOMY_PATH = os.getenv(
+    "HIRELY_SKILL_TAXONOMY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")
+)
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    # {"Canonical Skill": ["alias", ...]}; only the listed aliases match, so a skill whose name is an
+    # everyday word (R, Go, Express) is found through its unambiguous aliases alone
+    with open(path, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    return {skill: sorted({alias.lower() for alias in aliases}) for skill, aliases in taxonomy.items()}
+
+
+def _is_word_char(ch):
+    return ch.isalnum()
+
+
+class SkillMatcher:
+    # Aho-Corasick automaton over every alias, so a text is scanned once regardless of taxonomy size
+    def __init__(self, taxonomy):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for skill, aliases in taxonomy.items():
+            for alias in aliases:
+                self._add(alias, skill)
+        self._build_failure_links()
+
+    def _add(self, alias, skill):
+        state = 0
+        for ch in alias:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(alias), skill))
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text):
+        text = text.lower()
+        found = set()
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, skill in self.output[state]:
+                if skill in found:
+                    continue
+                start = end - length + 1
+                # Only whole-word hits: "java" must not match inside "javascript"
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if end + 1 < len(text) and _is_word_char(text[end + 1]) and _is_word_char(text[end]):
+                    continue
+                found.add(skill)
+        return found
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy())
+    return _matcher
+
+
+def find_skills(text):
+    return get_matcher().find(text)
+
+
+def missing_skills(resume_text, jd_text):
+    return sorted(find_skills(jd_text) - find_skills(resume_text))
+
+
+def merge_skills(skills, extra):
+    # Append free-text skills (e.g. from the LLM) that the taxonomy didn't already cover
+    merged = list(skills)
+    seen = {skill.lower() for skill in skills}
+    for item in extra:
+        item = item.strip().lstrip("-*• ").strip()
+        if not item:
+            continue
+        canonical = find_skills(item)
+        for skill in sorted(canonical or {item}):
+            if skill.lower() not in seen:
+                merged.append(skill)
+                seen.add(skill.lower())
+    return merged
+
+
+def format_skill_bullets(skills):
+    if not skills:
+        return "- No missing skills detected"
+    return "\n".join(f"- {skill}" for skill in skills)
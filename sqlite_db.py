@@ -0,0 +1,16 @@
+import os
+import sqlite3
+
+
+def connect(path, schema, pragmas=()):
+    # One WAL-mode connection per store, shared by its threads behind the store's own lock;
+    # readers in other processes (the batch CLI, a second app server) aren't blocked by writes
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    for pragma in pragmas:
+        db.execute(f"PRAGMA {pragma}")
+    db.executescript(schema)
+    db.commit()
+    return db
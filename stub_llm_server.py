@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Local stand-in for the Groq/Gemini OpenAI-compatible chat-completions API
+DEFAULT_CONFIG = {
+    "latency": 0.2,        # seconds before the first token
+    "jitter": 0.05,        # +/- seconds added to latency
+    "token_rate": 200.0,   # completion tokens per second (0 = instant)
+    "error_rate": 0.0,     # fraction of requests answered with an error
+    "error_status": 429,   # status used for injected errors
+    "retry_after": 0.1,    # Retry-After seconds sent with injected 429s
+    "completion_tokens": 120,
+}
+
+NAMES = ["Jane Doe", "John Smith", "Priya Raman", "Carlos Mendes", "Mei Chen", "Amara Okafor"]
+
+
+def _digest(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def fake_completion(messages, response_format, completion_tokens):
+    # Deterministic per prompt, shaped like what each helper expects back
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    seed = _digest(prompt)
+    if response_format:
+        # The digest request is the only one whose own message asks for a requirements digest
+        if "requirements digest" in str(messages[-1].get("content", "")).lower():
+            return json.dumps({"must_haves": ["Python", "AWS"], "nice_to_haves": ["Docker"], "seniority": "Senior"})
+        return json.dumps({
+            "candidate_name": NAMES[seed % len(NAMES)],
+            "summary": ["Led a team of five engineers", "Cut latency by 40%", "Shipped three ML products"],
+            "missing_skills": ["Kubernetes", "Terraform"],
+            "suggestions": ["Quantify impact", "Add a skills section", "Tailor the summary"],
+            "match_score": 40 + seed % 60,
+        })
+    if "match percentage" in prompt:
+        return str(40 + seed % 60)
+    if "full name" in prompt:
+        return NAMES[seed % len(NAMES)]
+    words = ["improve", "highlight", "impact", "python", "projects", "metrics", "leadership", "cloud"]
+    rng = random.Random(seed)
+    return "- " + " ".join(rng.choice(words) for _ in range(max(1, completion_tokens)))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record(request)
+
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        time.sleep(max(0.0, config["latency"] + random.uniform(-config["jitter"], config["jitter"])))
+
+        if random.random() < config["error_rate"]:
+            status = config["error_status"]
+            headers = {"Retry-After": str(config["retry_after"])} if status == 429 else None
+            self._send_json(status, {"error": {"message": "injected error", "type": "stub"}}, headers)
+            return
+
+        messages = request.get("messages", [])
+        content = fake_completion(messages, request.get("response_format"), config["completion_tokens"])
+        prompt_tokens = len(json.dumps(messages)) // 4
+        completion_tokens = max(1, len(content) // 4)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        model = request.get("model", "stub")
+
+        if request.get("stream"):
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self._stream(content, model, config["token_rate"], usage if include_usage else None)
+            return
+
+        if config["token_rate"]:
+            time.sleep(completion_tokens / config["token_rate"])
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _stream(self, content, model, token_rate, usage=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(data):
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        # Roughly one token per 4 characters
+        for start in range(0, len(content), 4):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + 4]}, "finish_reason": None}],
+            }
+            send(json.dumps(chunk))
+            if token_rate:
+                time.sleep(1 / token_rate)
+        if usage is not None:
+            # Like the real APIs: a final chunk with no choices that carries the usage
+            send(json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, StubHandler)
+        self.config = config
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Clients closing pooled keep-alive connections is expected, not an error
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def record(self, request):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_stub_server(host="127.0.0.1", port=0, **overrides):
+    # Serves on a background thread; call shutdown() when done
+    config = dict(DEFAULT_CONFIG, **overrides)
+    server = StubServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub for Hirely benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args(argv))
+
+    host, port = args.pop("host"), args.pop("port")
+    server = StubServer((host, port), dict(DEFAULT_CONFIG, **args))
+    print(f"🧪 Stub LLM server on {server.url} (set HIRELY_GROQ_BASE_URL / HIRELY_GEMINI_BASE_URL to it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
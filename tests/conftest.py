@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+# App modules read their settings at import time: keep caches and stores out of the working tree
+_state_dir = tempfile.mkdtemp(prefix="hirely-tests-")
+os.environ.setdefault("HIRELY_LLM_CACHE_PATH", os.path.join(_state_dir, "llm_cache.sqlite"))
+os.environ.setdefault("HIRELY_RESULTS_DB", os.path.join(_state_dir, "results.sqlite"))
+os.environ.setdefault("HIRELY_CHAT_DB", os.path.join(_state_dir, "chat.sqlite"))
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ["HIRELY_LLM_MODE"] = "live"
+for provider in ("GROQ", "GEMINI"):
+    os.environ[f"HIRELY_{provider}_RPM"] = "0"
+    os.environ[f"HIRELY_{provider}_TPM"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import resume_analysis
+from resume_analysis import select_chat_context
+
+
+RESUME = "\n\n".join(
+    f"Project {i}: built Python services on AWS with Docker, Kubernetes and PostgreSQL for team {i}." * 3
+    for i in range(30)
+)
+JD = "Senior backend engineer. Requirements: Python, AWS, Kubernetes, PostgreSQL, CI/CD."
+QUESTION = "How should I present my Kubernetes and AWS experience?"
+
+
+def test_system_message_and_question_come_out_of_the_budget(monkeypatch):
+    digest = {"role": "system", "content": "Job requirements digest: " + "Python AWS Kubernetes " * 60}
+    monkeypatch.setattr(resume_analysis, "jd_system_message", lambda jd_text, include_jd=True: digest)
+
+    for budget in (400, 800, 1500):
+        context = select_chat_context(RESUME, JD, QUESTION, summary="Backend engineer, 8 years.", budget_tokens=budget)
+        assert context["chunks"]
+        assert context["tokens"] <= budget
+
+
+def test_tokens_count_everything_sent(monkeypatch):
+    digest = {"role": "system", "content": "Job requirements digest."}
+    monkeypatch.setattr(resume_analysis, "jd_system_message", lambda jd_text, include_jd=True: digest)
+
+    context = select_chat_context(RESUME, JD, QUESTION, budget_tokens=1500)
+    excerpts = sum(resume_analysis.estimate_tokens(chunk.text) for chunk, _ in context["chunks"])
+    fixed = resume_analysis.estimate_tokens(digest["content"]) + resume_analysis.estimate_tokens(QUESTION)
+    assert context["tokens"] == excerpts + fixed
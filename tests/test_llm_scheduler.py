@@ -0,0 +1,177 @@
+import email.utils
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import (
+    ANALYSIS, BATCH, INTERACTIVE, ProviderLimiter, TokenBucket, _retry_after, backoff_delay, schedule, share_limits,
+)
+
+
+def http_error(headers):
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_settle_refunds_unused_estimate():
+    limiter = ProviderLimiter(0, 6000)
+    limiter.acquire(1000, ANALYSIS)
+    limiter.settle(1000, 400)
+    assert limiter.tokens.level == pytest.approx(5600, abs=5)
+
+
+def test_settle_charges_usage_over_estimate():
+    limiter = ProviderLimiter(0, 6000)
+    limiter.acquire(1000, ANALYSIS)
+    limiter.settle(1000, 7000)
+    # The overrun leaves the bucket in debt; the next caller waits it off
+    assert limiter.tokens.level == pytest.approx(-1000, abs=5)
+    assert limiter.tokens.wait_time(1, time.monotonic()) > 10
+
+
+def test_bucket_caps_requests_larger_than_capacity():
+    bucket = TokenBucket(60)
+    bucket.take(500)
+    assert bucket.level == pytest.approx(0, abs=1)
+    assert bucket.wait_time(500, time.monotonic()) == pytest.approx(60, abs=1)
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(0)
+    bucket.take(10 ** 9)
+    assert bucket.wait_time(10 ** 9, time.monotonic()) == 0.0
+
+
+def test_lanes_run_in_priority_then_arrival_order():
+    limiter = ProviderLimiter(0, 0)
+    limiter.pause(0.3)
+    order = []
+
+    def worker(name, lane):
+        limiter.acquire(1, lane)
+        order.append(name)
+
+    threads = []
+    for name, lane in (("batch", BATCH), ("analysis-1", ANALYSIS), ("chat", INTERACTIVE), ("analysis-2", ANALYSIS)):
+        thread = threading.Thread(target=worker, args=(name, lane))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: len(limiter._waiting) == len(threads))
+    assert limiter.saturated()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == ["chat", "analysis-1", "analysis-2", "batch"]
+    assert not limiter.saturated()
+
+
+def test_identical_requests_share_one_call():
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(schedule("test", "same-key", fn, 10))) for _ in range(3)]
+    threads[0].start()
+    wait_for(lambda: "same-key" in llm_scheduler._inflight)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == ["answer"] * 3
+    assert len(calls) == 1
+    assert "same-key" not in llm_scheduler._inflight
+
+
+def test_coalesced_callers_see_the_owners_error():
+    release = threading.Event()
+
+    def fn():
+        release.wait(2)
+        raise ValueError("bad request")
+
+    errors = []
+
+    def call():
+        try:
+            schedule("test", "failing-key", fn, 10)
+        except llm_scheduler.LLMError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    threads[0].start()
+    wait_for(lambda: "failing-key" in llm_scheduler._inflight)
+    threads[1].start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_uncoalesced_requests_each_call():
+    calls = []
+    for _ in range(2):
+        schedule("test", "key", lambda: calls.append(1) or "answer", 10, coalesce=False)
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after-ms": "250", "retry-after": "9"}, 0.25),
+    ({"retry-after": "2"}, 2.0),
+    ({"retry-after": "0.5"}, 0.5),
+    ({"retry-after-ms": "soon", "retry-after": "3"}, 3.0),
+    ({"retry-after": "not a date"}, None),
+    ({"retry-after": ""}, None),
+    ({}, None),
+    (None, None),
+])
+def test_retry_after_headers(headers, expected):
+    assert _retry_after(http_error(headers)) == expected
+
+
+def test_retry_after_http_date():
+    value = email.utils.formatdate(time.time() + 20, usegmt=True)
+    assert _retry_after(http_error({"retry-after": value})) == pytest.approx(20, abs=2)
+    past = email.utils.formatdate(time.time() - 60, usegmt=True)
+    assert _retry_after(http_error({"retry-after": past})) == 0.0
+
+
+def test_retry_after_without_response():
+    assert _retry_after(ValueError("boom")) is None
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    assert backoff_delay(0, http_error({"retry-after": "2"})) == 2.0
+    assert backoff_delay(0, http_error({"retry-after": "3600"})) == llm_scheduler.BACKOFF_MAX
+    for attempt in range(6):
+        delay = backoff_delay(attempt, http_error({}))
+        assert 0 <= delay <= min(llm_scheduler.BACKOFF_MAX, llm_scheduler.BACKOFF_BASE * 2 ** attempt)
+
+
+def test_share_limits_scales_quotas(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "PROVIDER_LIMITS", {
+        "groq": {"rpm": 30, "tpm": 30000},
+        "gemini": {"rpm": 1, "tpm": 0},
+    })
+    monkeypatch.setattr(llm_scheduler, "_limiters", {})
+    llm_scheduler.get_limiter("groq")
+    share_limits(0.5)
+    assert llm_scheduler.PROVIDER_LIMITS == {"groq": {"rpm": 15, "tpm": 15000}, "gemini": {"rpm": 1, "tpm": 0}}
+    # Limiters built before the change are rebuilt with the smaller quota
+    assert llm_scheduler.get_limiter("groq").requests.capacity == 15
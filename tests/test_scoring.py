@@ -0,0 +1,201 @@
+import threading
+import time
+
+import pytest
+
+import llm_client
+import llm_scheduler
+import scoring
+from llm_cache import ResponseCache, make_key
+from scoring import ScoringModel, ScoringOrchestrator, agreed
+from stub_llm_server import start_stub_server
+
+
+FAST = ScoringModel("Fast", "groq", "fast-model")
+OTHER = ScoringModel("Other", "groq", "other-model")
+SLOW = ScoringModel("Slow", "gemini", "slow-model")
+
+MESSAGES = [{"role": "user", "content": "Give the match percentage for this resume."}]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    # Per model, one (delay, answer) per call in order; the last one repeats
+    plans = {}
+    calls = []
+    lock = threading.Lock()
+
+    def complete(provider, model, messages, coalesce=True, validate=None, **params):
+        with lock:
+            index = sum(1 for call in calls if call["model"] == model)
+            calls.append({"model": model, "coalesce": coalesce})
+        plan = plans[model]
+        delay, answer = plan[min(index, len(plan) - 1)]
+        time.sleep(delay)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(scoring, "complete", complete)
+    monkeypatch.setattr(scoring, "cached_completion", lambda *args, **kwargs: None)
+    return plans, calls
+
+
+def warmed_up(orchestrator, seconds=0.01):
+    # Enough latency samples for hedge delays and timeouts to apply
+    for model in orchestrator.models:
+        for _ in range(orchestrator.latencies.min_samples):
+            orchestrator.latencies.observe(model, seconds)
+    return orchestrator
+
+
+def test_agreed():
+    assert agreed({"a": 70, "b": 75}, quorum=2, tolerance=10)
+    assert not agreed({"a": 20, "b": 90}, quorum=2, tolerance=10)
+    assert not agreed({"a": 70, "b": None}, quorum=2, tolerance=10)
+    assert not agreed({"a": 70, "b": 70}, quorum=0, tolerance=10)
+
+
+def test_scores_every_model_in_configured_order(fake_llm):
+    plans, _ = fake_llm
+    plans["slow-model"] = [(0.1, "80")]
+    plans["fast-model"] = [(0.0, "Match: 65%")]
+    scores = ScoringOrchestrator([SLOW, FAST], quorum=0, hedge=False, workers=4).score(MESSAGES)
+    assert list(scores.items()) == [("Slow", 80), ("Fast", 65)]
+
+
+def test_hedge_wins_over_a_straggler(fake_llm, monkeypatch):
+    monkeypatch.setattr(scoring, "MIN_HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(scoring, "MIN_TIMEOUT", 5.0)
+    plans, calls = fake_llm
+    plans["fast-model"] = [(1.0, "10"), (0.0, "70")]
+    orchestrator = warmed_up(ScoringOrchestrator([FAST], quorum=0, hedge=True, workers=4))
+
+    started = time.monotonic()
+    scores = orchestrator.score(MESSAGES)
+
+    assert scores == {"Fast": 70}
+    assert time.monotonic() - started < 0.8
+    assert [call["coalesce"] for call in calls] == [True, False]
+    assert orchestrator.stats["hedges"] == 1
+    assert orchestrator.stats["hedge_wins"] == 1
+
+
+def test_no_hedge_before_enough_samples(fake_llm, monkeypatch):
+    monkeypatch.setattr(scoring, "MIN_HEDGE_DELAY", 0.01)
+    plans, calls = fake_llm
+    plans["fast-model"] = [(0.2, "55")]
+    orchestrator = ScoringOrchestrator([FAST], quorum=0, hedge=True, workers=4)
+
+    assert orchestrator.score(MESSAGES) == {"Fast": 55}
+    assert len(calls) == 1
+    assert orchestrator.stats["hedges"] == 0
+
+
+def test_adaptive_timeout_gives_up_on_a_slow_model(fake_llm, monkeypatch):
+    monkeypatch.setattr(scoring, "MIN_TIMEOUT", 0.2)
+    plans, _ = fake_llm
+    plans["fast-model"] = [(0.0, "60")]
+    plans["slow-model"] = [(2.0, "90")]
+    orchestrator = warmed_up(ScoringOrchestrator([FAST, SLOW], quorum=0, hedge=False, workers=4))
+    errors = []
+
+    started = time.monotonic()
+    scores = orchestrator.score(MESSAGES, on_error=errors.append)
+
+    assert scores == {"Fast": 60, "Slow": None}
+    assert time.monotonic() - started < 1.0
+    assert orchestrator.stats["timeouts"] == 1
+    assert len(errors) == 1 and "adaptive timeout" in errors[0]
+
+
+def test_quorum_exits_early_when_models_agree(fake_llm):
+    plans, _ = fake_llm
+    plans["fast-model"] = [(0.0, "70")]
+    plans["other-model"] = [(0.0, "74")]
+    plans["slow-model"] = [(1.0, "20")]
+    orchestrator = ScoringOrchestrator([FAST, OTHER, SLOW], quorum=2, tolerance=10, hedge=False, workers=4)
+
+    started = time.monotonic()
+    scores = orchestrator.score(MESSAGES)
+
+    assert scores == {"Fast": 70, "Other": 74}
+    assert time.monotonic() - started < 0.8
+    assert orchestrator.stats["early_exits"] == 1
+
+
+def test_quorum_waits_when_models_disagree(fake_llm):
+    plans, _ = fake_llm
+    plans["fast-model"] = [(0.0, "20")]
+    plans["other-model"] = [(0.0, "90")]
+    plans["slow-model"] = [(0.2, "85")]
+    orchestrator = ScoringOrchestrator([FAST, OTHER, SLOW], quorum=2, tolerance=10, hedge=False, workers=4)
+
+    assert orchestrator.score(MESSAGES) == {"Fast": 20, "Other": 90, "Slow": 85}
+    assert orchestrator.stats["early_exits"] == 0
+
+
+def test_known_scores_are_not_requested_again(fake_llm):
+    plans, calls = fake_llm
+    plans["fast-model"] = [(0.0, "50")]
+    orchestrator = ScoringOrchestrator([FAST, SLOW], quorum=0, hedge=False, workers=4)
+
+    assert orchestrator.score(MESSAGES, known={"Slow": 88}) == {"Slow": 88, "Fast": 50}
+    assert [call["model"] for call in calls] == ["fast-model"]
+
+
+@pytest.fixture
+def stub_provider(monkeypatch, tmp_path):
+    # The real client stack against the local stub, with a private response cache
+    server = start_stub_server(latency=0.0, jitter=0.0, token_rate=0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.sqlite"))
+    monkeypatch.setitem(llm_client.PROVIDERS, "groq", dict(llm_client.PROVIDERS["groq"], base_url=base_url))
+    monkeypatch.setattr(llm_client, "_clients", {})
+    monkeypatch.setattr(llm_client, "response_cache", cache)
+    yield server, cache
+    server.shutdown()
+
+
+def test_unparseable_cached_score_is_requested_again(stub_provider):
+    server, cache = stub_provider
+    key = make_key(FAST.provider, FAST.model, MESSAGES, {})
+    cache.set(key, "I cannot determine a score.")
+    orchestrator = ScoringOrchestrator([FAST], quorum=0, hedge=False, workers=2)
+
+    first = orchestrator.score(MESSAGES)
+    assert first["Fast"] is not None
+    assert server.requests == 1
+    assert scoring.parse_score(cache.get(key)) == first["Fast"]
+
+    # The good answer replaced the bad one, so the next score is served from the cache
+    assert orchestrator.score(MESSAGES) == first
+    assert server.requests == 1
+
+
+def test_unparseable_reply_is_not_cached(stub_provider):
+    server, cache = stub_provider
+    messages = [{"role": "user", "content": "Describe this resume."}]
+
+    assert ScoringOrchestrator([FAST], quorum=0, hedge=False, workers=2).score(messages) == {"Fast": None}
+    assert cache.get(make_key(FAST.provider, FAST.model, messages, {})) is None
+
+
+def test_latency_samples_leave_out_limiter_waits(stub_provider, monkeypatch):
+    server, cache = stub_provider
+    monkeypatch.setattr(llm_scheduler, "_limiters", {})
+    llm_scheduler.get_limiter(FAST.provider).pause(0.5)
+    orchestrator = ScoringOrchestrator([FAST], quorum=0, hedge=False, workers=2)
+
+    started = time.monotonic()
+    assert orchestrator.score(MESSAGES)["Fast"] is not None
+    assert time.monotonic() - started >= 0.5
+    samples = list(orchestrator.latencies._samples[(FAST.provider, FAST.model)])
+    assert len(samples) == 1 and samples[0] < 0.25
+
+    # A cache hit inside complete() isn't a provider round trip either
+    orchestrator.latencies = scoring.LatencyTracker()
+    monkeypatch.setattr(scoring, "cached_completion", lambda *args, **kwargs: None)
+    orchestrator.score(MESSAGES)
+    assert server.requests == 1
+    assert not orchestrator.latencies._samples
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from skill_extractor import SkillMatcher, find_skills, load_taxonomy, merge_skills, missing_skills
+
+
+@pytest.mark.parametrize("text", [
+    "Join our R&D team",
+    "You will go above and beyond",
+    "Express ideas clearly to stakeholders",
+    "Spring hiring for the summer",
+    "You will excel in a fast-paced team",
+    "React quickly to incidents",
+    "Spark new ideas and take the helm",
+    "Swift delivery expected",
+    "Rust on the old pipes",
+    "Carry the torch and stay on the rails",
+])
+def test_everyday_words_are_not_skills(text):
+    assert find_skills(text) == set()
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Experience with R programming and RStudio", "R"),
+    ("Services written in Golang", "Go"),
+    ("REST APIs in Express.js", "Express"),
+    ("Backend on the Spring Framework", "Spring"),
+    ("Styled with Tailwind CSS", "Tailwind CSS"),
+    ("Frontend in React.js with hooks", "React"),
+    ("ETL on Apache Spark and PySpark", "Spark"),
+    ("Deployed with Helm charts", "Helm"),
+    ("Advanced Excel and Microsoft Excel macros", "Excel"),
+    ("Apps built with SwiftUI", "Swift"),
+    ("Systems code in Rust lang", "Rust"),
+    ("Backend on Ruby on Rails", "Ruby on Rails"),
+])
+def test_ambiguous_skills_match_through_their_aliases(text, skill):
+    assert skill in find_skills(text)
+
+
+def test_whole_words_only():
+    assert find_skills("JavaScript and TypeScript") >= {"JavaScript"}
+    assert "Java" not in find_skills("JavaScript")
+    assert "SQL" not in find_skills("PostgreSQL")
+    assert "PostgreSQL" in find_skills("PostgreSQL")
+    assert "Machine Learning" not in find_skills("html parsing")
+
+
+def test_symbols_and_punctuation_around_aliases():
+    assert find_skills("C++, C# and .NET (ASP.NET); Node.js.") >= {"C++", "C#", ".NET", "Node.js"}
+    assert find_skills("k8s/python") >= {"Kubernetes", "Python"}
+
+
+def test_case_insensitive_and_canonical_names():
+    assert find_skills("PYTHON3 on KUBERNETES") == {"Python", "Kubernetes"}
+
+
+def test_overlapping_aliases():
+    matcher = SkillMatcher({"Data": ["data"], "Data Science": ["data science"], "Science": ["science"]})
+    assert matcher.find("data science") == {"Data", "Data Science", "Science"}
+    assert matcher.find("big data pipelines") == {"Data"}
+
+
+def test_failure_links_recover_partial_matches():
+    matcher = SkillMatcher({"Abc": ["abc"], "Bcd": ["bcd"]})
+    assert matcher.find("ab bcd") == {"Bcd"}
+    assert matcher.find("xabcd") == set()
+
+
+def test_load_taxonomy_uses_only_listed_aliases(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"Go": ["golang"], "Python": ["Python", "py3"]}))
+    assert load_taxonomy(str(path)) == {"Go": ["golang"], "Python": ["py3", "python"]}
+
+
+def test_everyday_words_are_not_skill_gaps():
+    jd = ("You will excel in a fast-paced team, react quickly to incidents, spark new ideas and take the helm. "
+          "Swift delivery expected.")
+    assert missing_skills("Python developer", jd) == []
+
+
+def test_missing_skills_and_merge():
+    jd = "We need Python, AWS, Docker and Kubernetes."
+    resume = "Built Python services on AWS."
+    assert missing_skills(resume, jd) == ["Docker", "Kubernetes"]
+    assert merge_skills(["Docker"], ["- docker", "* Terraform", "", "Quantum knitting"]) == [
+        "Docker", "Terraform", "Quantum knitting"
+    ]
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+
+# USD per million prompt/completion tokens; override with a JSON object in HIRELY_LLM_PRICING
+DEFAULT_PRICING = {
+    "llama3-8b-8192": [0.05, 0.08],
+    "llama3-70b-8192": [0.59, 0.79],
+    "gemini-2.0-flash": [0.10, 0.40],
+}
+PRICING = dict(DEFAULT_PRICING, **json.loads(os.getenv("HIRELY_LLM_PRICING") or "{}"))
+
+_tracer = ContextVar("hirely_tracer", default=None)
+_span = ContextVar("hirely_span", default=None)
+
+
+def llm_cost(model, prompt_tokens, completion_tokens):
+    price = PRICING.get(model)
+    if not price:
+        return 0.0
+    return ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
+
+
+class Tracer:
+    # One record per traced stage call: wall time, LLM usage, cache hits and errors
+    def __init__(self, run_id=None):
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        token = _tracer.set(self)
+        try:
+            yield self
+        finally:
+            _tracer.reset(token)
+
+    @contextmanager
+    def span(self, stage, resume=None):
+        record = {
+            "run": self.run_id,
+            "stage": stage,
+            "resume": resume,
+            "start": time.time(),
+            "seconds": 0.0,
+            "llm_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "hedges": 0,
+            "errors": 0,
+            "error": None,
+            "cost_usd": 0.0,
+            "pdf": None,
+        }
+        tracer_token = _tracer.set(self)
+        span_token = _span.set(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["errors"] += 1
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            _span.reset(span_token)
+            _tracer.reset(tracer_token)
+            with self._lock:
+                self.records.append(record)
+
+    def wrap(self, stage, resume, fn):
+        # For pool workers: the span runs on whichever thread executes fn
+        def traced_call(*args, **kwargs):
+            with self.span(stage, resume):
+                return fn(*args, **kwargs)
+        return traced_call
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def summarize(self, key):
+        # Totals per stage or per resume, plus latency percentiles
+        groups = {}
+        for record in self.snapshot():
+            groups.setdefault(record[key], []).append(record)
+
+        rows = []
+        for name, records in groups.items():
+            seconds = np.array([record["seconds"] for record in records])
+            rows.append({
+                key: name,
+                "calls": len(records),
+                "total_s": round(float(seconds.sum()), 3),
+                "p50_s": round(float(np.percentile(seconds, 50)), 3),
+                "p95_s": round(float(np.percentile(seconds, 95)), 3),
+                "llm_calls": sum(record["llm_calls"] for record in records),
+                "prompt_tokens": sum(record["prompt_tokens"] for record in records),
+                "completion_tokens": sum(record["completion_tokens"] for record in records),
+                "cache_hits": sum(record["cache_hits"] for record in records),
+                "retries": sum(record["retries"] for record in records),
+                "hedges": sum(record["hedges"] for record in records),
+                "errors": sum(record["errors"] for record in records),
+                "cost_usd": round(sum(record["cost_usd"] for record in records), 6),
+            })
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def to_jsonl(self):
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.snapshot())
+
+    def to_prometheus(self):
+        metrics = [
+            ("hirely_stage_seconds_total", "Wall time spent in each stage", "total_s"),
+            ("hirely_stage_calls_total", "Traced calls per stage", "calls"),
+            ("hirely_llm_calls_total", "LLM requests made per stage, cache hits included", "llm_calls"),
+            ("hirely_llm_prompt_tokens_total", "Prompt tokens reported by the provider", "prompt_tokens"),
+            ("hirely_llm_completion_tokens_total", "Completion tokens reported by the provider", "completion_tokens"),
+            ("hirely_cache_hits_total", "LLM and document cache hits per stage", "cache_hits"),
+            ("hirely_llm_retries_total", "LLM requests retried after a transient error", "retries"),
+            ("hirely_llm_hedges_total", "Duplicate requests sent for slow scoring calls", "hedges"),
+            ("hirely_errors_total", "Errors raised inside each stage", "errors"),
+            ("hirely_llm_cost_usd_total", "Estimated LLM cost in USD", "cost_usd"),
+        ]
+        rows = self.summarize("stage")
+        lines = []
+        for name, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for row in rows:
+                lines.append(f'{name}{{stage="{_label(row["stage"])}"}} {row[field]}')
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@contextmanager
+def span(stage, resume=None):
+    # No-op unless a tracer is active in this context
+    tracer = _tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(stage, resume) as record:
+        yield record
+
+
+def traced(stage, resume, fn):
+    # Binds fn to the caller's tracer so it can be handed to a thread pool
+    tracer = _tracer.get()
+    return fn if tracer is None else tracer.wrap(stage, resume, fn)
+
+
+def record_llm(model, usage=None, cache_hit=False, error=None):
+    # Called by llm_client for every request; attributed to the innermost open span
+    record = _span.get()
+    if record is None:
+        return
+    record["llm_calls"] += 1
+    if cache_hit:
+        record["cache_hits"] += 1
+    if error is not None:
+        record["errors"] += 1
+        record["error"] = f"{type(error).__name__}: {error}"
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        record["prompt_tokens"] += prompt_tokens
+        record["completion_tokens"] += completion_tokens
+        record["cost_usd"] += llm_cost(model, prompt_tokens, completion_tokens)
+
+
+def record_retry():
+    record = _span.get()
+    if record is not None:
+        record["retries"] += 1
+
+
+def record_hedge():
+    record = _span.get()
+    if record is not None:
+        record["hedges"] += 1
+
+
+def record_pdf(report):
+    # pdf_extract.timing_report of the document this span ingested
+    record = _span.get()
+    if record is not None:
+        record["pdf"] = report
+
+
+def record_cache_hit():
+    record = _span.get()
+    if record is not None:
+        record["cache_hits"] += 1